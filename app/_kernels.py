@@ -0,0 +1,50 @@
+"""
+Numba kernels for the per-pixel loops of image conversion.
+
+Kernels are None when numba is not installed; callers keep a numpy/Pillow
+fallback. They compile on first call for the dtypes actually seen and are
+cached on disk (cache=True), so worker processes load them instead of
+recompiling.
+"""
+
+import numpy as np
+
+# Optional JIT
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    # Single-threaded on purpose: numba's parallel (TBB) runtime hangs at interpreter
+    # exit when kernels run off the main thread, and requests already render in parallel
+    @njit(fastmath=True, cache=True)
+    def rescale_window_u8(src, slope, intercept, window_min, window_max, out):
+        """Rescale, window and quantize to uint8 reading each pixel once."""
+        src_flat = src.ravel()
+        out_flat = out.ravel()
+        scale = 255.0 / (window_max - window_min)
+        for i in range(src_flat.size):
+            value = (src_flat[i] * slope + intercept - window_min) * scale
+            if value < 0.0:
+                out_flat[i] = 0
+            elif value > 255.0:
+                out_flat[i] = 255
+            else:
+                out_flat[i] = np.uint8(value)
+    
+    @njit(cache=True)
+    def alpha_over_white_u8(src, out):
+        """Composite RGBA/LA pixels over white in one pass (same rounding as PIL paste)."""
+        height, width, channels = src.shape
+        alpha_channel = channels - 1
+        for y in range(height):
+            for x in range(width):
+                alpha = np.uint32(src[y, x, alpha_channel])
+                for c in range(alpha_channel):
+                    blended = np.uint32(src[y, x, c]) * alpha + 255 * (255 - alpha) + 128
+                    out[y, x, c] = (blended + (blended >> 8)) >> 8
+else:
+    rescale_window_u8 = None
+    alpha_over_white_u8 = None
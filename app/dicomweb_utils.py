@@ -2,84 +2,132 @@
 DICOMweb WADO utilities for retrieving DICOM instances via WADO-RS protocol.
 Integra com API existente mantendo todas as variáveis e estrutura atual.
 """
+import functools
+import itertools
 import os
 import logging
 import time
 import json
-import urllib.request
 import urllib.parse
-import urllib.error
 from io import BytesIO
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import pydicom
+import requests
+from requests.adapters import HTTPAdapter
 from pydicom.dataset import Dataset
 
 from .models import DicomStudy
 
+# Parser JSON acelerado (opcional) - aceita bytes diretamente
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+def create_wado_session() -> requests.Session:
+    """
+    Cria uma sessão HTTP com pool de conexões keep-alive para o servidor WADO.
+    
+    Todas as requisições vão para o mesmo host, então um único pool com
+    tamanho igual ao máximo de workers evita um handshake TCP/TLS por instância.
+    Com pool_block=True, downloads excedentes aguardam uma conexão livre em vez
+    de abrir conexões extras que seriam descartadas ao final da requisição.
+    """
+    pool_size = int(os.getenv('MAX_ALLOWED_WORKERS', '8'))
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': 'DICOM-PDF-Converter/1.0',
+        # JSON de metadados comprime bem; requests/urllib3 descomprimem de forma transparente
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+# Sessão compartilhada entre todas as threads de download (urllib3 é thread-safe)
+_SESSION = create_wado_session()
+
+# Executor único reutilizado entre estudos: threads são criadas sob demanda e
+# mantidas vivas, evitando o custo de criação/destruição a cada estudo
+_DOWNLOAD_EXECUTOR = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 4) * 4),
+    thread_name_prefix='wado-dl'
+)
+
+@functools.lru_cache(maxsize=1)
 def get_dicom_wado_url() -> str:
-    """Get DICOM WADO URL from environment with proper validation"""
+    """Get DICOM WADO URL from environment with proper validation (cached, without trailing slash)"""
     # Try multiple ways to get the URL
     url = os.getenv('DICOM_WADO_URL', '').strip()
     
     # Remove quotes if present
     url = url.strip('"\'')
     
-    logger.debug(f"🔍 DICOM_WADO_URL raw value: {repr(os.getenv('DICOM_WADO_URL'))}")
-    logger.debug(f"🔍 DICOM_WADO_URL cleaned: {repr(url)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔍 DICOM_WADO_URL raw value: %s", repr(os.getenv('DICOM_WADO_URL')))
+        logger.debug("🔍 DICOM_WADO_URL cleaned: %s", repr(url))
     
     if not url:
         raise ValueError("DICOM_WADO_URL environment variable not configured or empty")
     
-    return url
+    return url.rstrip('/')
 
-def get_study_metadata(study_iuid: str) -> Dict:
+def get_study_metadata(study_iuid: str, session: Optional[requests.Session] = None) -> Dict:
     """
     Busca metadados do estudo via DICOMweb WADO.
     
     Primeira requisição: GET {URL_BASE}/{studyiuid}
     Retorna JSON com estrutura de metadados DICOM
     """
+    session = session or _SESSION
     try:
         dicom_wado_url = get_dicom_wado_url()
         
         # URL para buscar metadados do estudo
-        metadata_url = f"{dicom_wado_url.rstrip('/')}?studyUID={study_iuid}"
+        metadata_url = f"{dicom_wado_url}?studyUID={study_iuid}"
         
-        logger.info(f"🌐 Fetching study metadata from: {metadata_url}")
+        logger.info("🌐 Fetching study metadata from: %s", metadata_url)
         
-        # Fazer requisição HTTP
-        req = urllib.request.Request(metadata_url)
-        req.add_header('Accept', 'application/json')
-        req.add_header('User-Agent', 'DICOM-PDF-Converter/1.0')
+        # Fazer requisição HTTP reutilizando a conexão do pool
+        response = session.get(
+            metadata_url,
+            headers={'Accept': 'application/json'},
+            timeout=30
+        )
         
-        with urllib.request.urlopen(req, timeout=30) as response:
-            if response.status == 200:
-                content = response.read().decode('utf-8')
-                metadata = json.loads(content)
-                
-                logger.info(f"✅ Successfully fetched metadata for study {study_iuid}")
-                logger.debug(f"📋 Metadata keys: {list(metadata.keys())}")
-                
-                return metadata
-            else:
-                raise urllib.error.HTTPError(
-                    metadata_url, response.status, 
-                    f"HTTP {response.status}", response.headers, None
-                )
+        if response.status_code == 200:
+            metadata = _json_loads(response.content)
+            
+            logger.info("✅ Successfully fetched metadata for study %s", study_iuid)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📋 Metadata keys: %s", list(metadata.keys()))
+            
+            return metadata
+        else:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
                 
     except Exception as e:
-        logger.error(f"❌ Failed to fetch study metadata: {e}")
+        logger.error("❌ Failed to fetch study metadata: %s", e)
         raise
 
-def download_dicom_instance(study_uid: str, series_uid: str, sop_uid: str) -> Optional[Dataset]:
+def download_dicom_instance(
+    study_uid: str,
+    series_uid: str,
+    sop_uid: str,
+    session: Optional[requests.Session] = None) -> Optional[Dataset]:
     """
     Download de uma instância DICOM específica.
     
     URL: {URL_BASE}/?studyUID={studyuid}&seriesUID={seriesiuid}&objectUID={sopiuid}
     """
+    session = session or _SESSION
     try:
         dicom_wado_url = get_dicom_wado_url()
         
@@ -91,36 +139,129 @@ def download_dicom_instance(study_uid: str, series_uid: str, sop_uid: str) -> Op
         }
         
         # URL para download da instância
-        instance_url = f"{dicom_wado_url.rstrip('/')}/images?{urllib.parse.urlencode(params)}"
+        instance_url = f"{dicom_wado_url}/images?{urllib.parse.urlencode(params)}"
         
-        # Fazer requisição HTTP com timeout reduzido
-        req = urllib.request.Request(instance_url)
-        req.add_header('Accept', 'application/dicom')
-        req.add_header('User-Agent', 'DICOM-PDF-Converter/1.0')
-        req.add_header('Connection', 'keep-alive')  # Reutilizar conexões
-        
-        with urllib.request.urlopen(req, timeout=15) as response:  # Timeout reduzido de 60s para 15s
-            if response.status == 200:
-                dicom_data = response.read()
+        # Fazer requisição HTTP com timeout reduzido, reutilizando conexões do pool
+        with session.get(
+            instance_url,
+            headers={'Accept': 'application/dicom'},
+            timeout=15,  # Timeout reduzido de 60s para 15s
+            stream=True
+        ) as response:
+            if response.status_code == 200:
+                # Leitura única do corpo direto do socket: evita a lista de chunks
+                # + join de response.content. Com Content-Length o http.client
+                # aloca o buffer já no tamanho final; com Content-Encoding gzip o
+                # urllib3 descomprime aqui. O pydicom precisa de um arquivo com
+                # seek, e BytesIO(bytes) compartilha o buffer sem copiá-lo.
+                dicom_data = response.raw.read(decode_content=True)
                 
                 # Converter bytes para Dataset DICOM
                 dataset = pydicom.dcmread(BytesIO(dicom_data))
                 
                 # Log apenas para downloads grandes ou lentos
                 if len(dicom_data) > 1024*1024:  # > 1MB
-                    logger.debug(f"✅ Downloaded large instance {sop_uid} ({len(dicom_data)/1024/1024:.1f}MB)")
+                    logger.debug("✅ Downloaded large instance %s (%.1fMB)", sop_uid, len(dicom_data)/1024/1024)
                 
                 return dataset
             else:
-                raise urllib.error.HTTPError(
-                    instance_url, response.status,
-                    f"HTTP {response.status}", response.headers, None
-                )
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
                 
     except Exception as e:
-        logger.warning(f"⚠️ Failed to download instance {sop_uid}: {e}")
+        logger.warning("⚠️ Failed to download instance %s: %s", sop_uid, e)
         return None
 
+def _iter_multipart_parts(body: bytes, content_type: str) -> Iterator[memoryview]:
+    """
+    Separa um corpo multipart/related nas partes binárias, sem os cabeçalhos.
+    
+    Só reconhece delimitadores no início de linha (CRLF + "--boundary", RFC 2046),
+    então o boundary dentro dos dados binários não corta a parte. As partes são
+    memoryviews do corpo original (sem cópia).
+    """
+    boundary = None
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'boundary':
+            boundary = value.strip('"')
+    if not boundary:
+        raise ValueError(f"Missing multipart boundary in Content-Type: {content_type}")
+    
+    dash_boundary = b'--' + boundary.encode()
+    delimiter = b'\r\n' + dash_boundary
+    # O primeiro delimitador pode abrir o corpo (sem preâmbulo nem CRLF antes)
+    if body.startswith(dash_boundary):
+        position = len(dash_boundary)
+    else:
+        position = body.find(delimiter)
+        if position < 0:
+            return
+        position += len(delimiter)
+    
+    view = memoryview(body)
+    while not body.startswith(b'--', position):  # "--boundary--": delimitador final
+        line_end = body.find(b'\r\n', position)
+        if line_end < 0:
+            return
+        next_delimiter = body.find(delimiter, line_end)
+        if next_delimiter < 0:
+            return  # Corpo truncado, sem o delimitador de fechamento
+        headers_end = body.find(b'\r\n\r\n', line_end, next_delimiter + 2)
+        if headers_end >= 0:
+            yield view[headers_end + 4:next_delimiter]
+        position = next_delimiter + len(delimiter)
+
+def download_study_bulk(
+    study_uid: str,
+    session: Optional[requests.Session] = None) -> Iterator[Dataset]:
+    """
+    Download do estudo inteiro em uma única requisição WADO-RS.
+    
+    URL: {URL_BASE}/studies/{studyuid} (multipart/related; type="application/dicom")
+    Levanta requests.HTTPError se o servidor não suportar o endpoint.
+    """
+    session = session or _SESSION
+    study_url = f"{get_dicom_wado_url()}/studies/{study_uid}"
+    
+    logger.info("🌐 Fetching whole study in bulk from: %s", study_url)
+    
+    response = session.get(
+        study_url,
+        headers={'Accept': 'multipart/related; type="application/dicom"'},
+        timeout=120
+    )
+    if response.status_code != 200:
+        raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+    
+    content_type = response.headers.get('Content-Type', '')
+    if not content_type.lower().startswith('multipart/related'):
+        raise ValueError(f"Unexpected bulk response Content-Type: {content_type}")
+    
+    for part in _iter_multipart_parts(response.content, content_type):
+        yield pydicom.dcmread(BytesIO(part))
+
+def _iter_instances(metadata: Dict) -> Iterator[Tuple[str, str, str]]:
+    """
+    Percorre o JSON de metadados e gera (study_uid, series_uid, sop_uid)
+    para cada instância válida, ignorando entradas sem UID.
+    """
+    for study_data in metadata.get('studies', []):
+        study_uid = study_data.get('study_iuid')
+        if not study_uid:
+            logger.warning("⚠️ Study without study_iuid, skipping")
+            continue
+        
+        for series_data in study_data.get('series', []):
+            series_uid = series_data.get('series_iuid')
+            if not series_uid:
+                logger.warning("⚠️ Series without series_iuid, skipping")
+                continue
+            
+            for instance_data in series_data.get('instances', []):
+                sop_uid = instance_data.get('sop_iuid')
+                if sop_uid:
+                    yield study_uid, series_uid, sop_uid
+
 def optimize_max_workers(total_instances: int, requested_workers: int) -> int:
     """
     Otimiza o número de workers baseado no número total de instâncias
@@ -155,135 +296,139 @@ def process_dicom_wado_study(
         Dict com estudos organizados: {study_uid: DicomStudy}
     """
     start_time = time.time()
-    logger.info(f"🌐 Starting DICOMweb WADO processing for study: {study_iuid}")
-    logger.info(f"⚙️ Using {max_workers} worker threads for parallel download")
+    logger.info("🌐 Starting DICOMweb WADO processing for study: %s", study_iuid)
+    logger.info("⚙️ Using %s worker threads for parallel download", max_workers)
     
     try:
         # Verificar se a URL está configurada
         dicom_wado_url = get_dicom_wado_url()
-        logger.info(f"🔗 Using DICOM server: {dicom_wado_url}")
+        logger.info("🔗 Using DICOM server: %s", dicom_wado_url)
+        
+        # Mesmo pool de conexões para metadados e todos os downloads do estudo
+        session = _SESSION
+        dicom_studies: Dict[str, DicomStudy] = {}
+        
+        # 0. Download em lote (uma única requisição), se habilitado no servidor
+        if os.getenv('DICOM_WADO_BULK', '0') == '1':
+            try:
+                bulk_start = time.time()
+                for dataset in download_study_bulk(study_iuid, session):
+                    study_uid = getattr(dataset, 'StudyInstanceUID', study_iuid)
+                    if study_uid not in dicom_studies:
+                        dicom_studies[study_uid] = DicomStudy(study_uid)
+                    dicom_studies[study_uid].add_instance(dataset)
+                
+                studies = {}
+                for study_uid, dicom_study in dicom_studies.items():
+                    if dicom_study.series:
+                        dicom_study.finalize()
+                        studies[study_uid] = dicom_study
+                
+                if studies:
+                    logger.info("✅ Bulk download completed in %.2fs (%s studies)", time.time() - bulk_start, len(studies))
+                    return studies
+                logger.warning("⚠️ Bulk download returned no instances, falling back to per-instance download")
+            except Exception as e:
+                logger.warning("⚠️ Bulk download unavailable (%s), falling back to per-instance download", e)
         
         # 1. Buscar metadados do estudo
         metadata_start = time.time()
-        metadata = get_study_metadata(study_iuid)
+        metadata = get_study_metadata(study_iuid, session)
         metadata_time = time.time() - metadata_start
         
-        logger.info(f"📋 Metadata fetched in {metadata_time:.2f}s")
+        logger.info("📋 Metadata fetched in %.2fs", metadata_time)
+        
+        # 2. Verificar se existe a estrutura esperada
+        if 'studies' not in metadata:
+            raise ValueError(f"Invalid metadata structure: missing 'studies' key. Available keys: {list(metadata.keys())}")
+        
+        # Percorrer o JSON uma única vez: lista de (study, series, sop) + estudos na ordem dos metadados
+        instances = []
+        dicom_studies = {}  # Descarta o que um download em lote incompleto tenha deixado
+        for study_uid, series_uid, sop_uid in _iter_instances(metadata):
+            if study_uid not in dicom_studies:
+                dicom_studies[study_uid] = DicomStudy(study_uid)
+            instances.append((study_uid, series_uid, sop_uid))
+        total_instances_count = len(instances)
         
-        # 2. Contar total de instâncias primeiro para otimizar workers
-        total_instances_count = 0
-        for study_data in metadata.get('studies', []):
-            for series_data in study_data.get('series', []):
-                total_instances_count += len(series_data.get('instances', []))
+        logger.info("📊 Found %s instances in %s studies", total_instances_count, len(dicom_studies))
         
         # Otimizar número de workers baseado no volume
         optimized_workers = optimize_max_workers(total_instances_count, max_workers)
         if optimized_workers != max_workers:
-            logger.info(f"⚙️ Optimized workers: {max_workers} → {optimized_workers} (for {total_instances_count} instances)")
+            logger.info("⚙️ Optimized workers: %s → %s (for %s instances)", max_workers, optimized_workers, total_instances_count)
             max_workers = optimized_workers
         
-        # 3. Organizar dados do JSON
-        studies = {}
+        # 3. Download das instâncias - OTIMIZADO
+        download_start = time.time()
+        success_count = 0
         
-        # Verificar se existe a estrutura esperada
-        if 'studies' not in metadata:
-            raise ValueError(f"Invalid metadata structure: missing 'studies' key. Available keys: {list(metadata.keys())}")
-        
-        # Processar cada estudo
-        for study_data in metadata['studies']:
-            study_uid = study_data.get('study_iuid')
-            if not study_uid:
-                logger.warning("⚠️ Study without study_iuid, skipping")
-                continue
+        # Usar paralelismo mesmo para poucos instances (mínimo 2)
+        if max_workers > 1 and total_instances_count >= 2:
+            logger.info("🚀 Starting parallel download with %s workers for %s instances", max_workers, total_instances_count)
             
-            # Criar objeto DicomStudy
-            dicom_study = DicomStudy(study_uid)
+            # Janela deslizante no executor global: no máximo max_workers downloads
+            # deste estudo em andamento, memória limitada independente do número de instâncias
+            instance_iter = iter(instances)
+            pending = {}
             
-            # Processar séries do estudo
-            series_list = study_data.get('series', [])
-            logger.info(f"📊 Processing {len(series_list)} series for study {study_uid}")
+            def submit_downloads(count: int) -> None:
+                for study_uid, series_uid, sop_uid in itertools.islice(instance_iter, count):
+                    future = _DOWNLOAD_EXECUTOR.submit(
+                        download_dicom_instance, 
+                        study_uid, series_uid, sop_uid, session
+                    )
+                    pending[future] = study_uid
             
-            for series_data in series_list:
-                series_uid = series_data.get('series_iuid')
-                if not series_uid:
-                    logger.warning("⚠️ Series without series_iuid, skipping")
-                    continue
-                
-                # Processar instâncias da série
-                instances = series_data.get('instances', [])
-                logger.info(f"📁 Series {series_uid}: {len(instances)} instances")
-                
-                # Download paralelo das instâncias - OTIMIZADO
-                download_start = time.time()
-                downloaded_instances = []
-                
-                # Usar paralelismo mesmo para poucos instances (mínimo 2)
-                if max_workers > 1 and len(instances) >= 2:
-                    # Download paralelo com batch processing
-                    logger.info(f"🚀 Starting parallel download with {max_workers} workers for {len(instances)} instances")
-                    
-                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                        # Submeter downloads em batch
-                        future_to_sop = {}
-                        for instance_data in instances:
-                            sop_uid = instance_data.get('sop_iuid')
-                            if sop_uid:
-                                future = executor.submit(
-                                    download_dicom_instance, 
-                                    study_uid, series_uid, sop_uid
-                                )
-                                future_to_sop[future] = sop_uid
-                        
-                        # Coletar resultados com progress tracking
-                        completed = 0
-                        
-                        for future in as_completed(future_to_sop):
-                            dataset = future.result()
-                            completed += 1
-                            
-                            if dataset:
-                                downloaded_instances.append(dataset)
-                else:
-                    # Download sequencial otimizado
-                    logger.info(f"🔄 Starting sequential download for {len(instances)} instances")
-                    
-                    for i, instance_data in enumerate(instances):
-                        sop_uid = instance_data.get('sop_iuid')
-                        if sop_uid:
-                            dataset = download_dicom_instance(study_uid, series_uid, sop_uid)
-                            if dataset:
-                                downloaded_instances.append(dataset)
-                        
-                download_time = time.time() - download_start
-                success_count = len(downloaded_instances)
-                total_count = len(instances)
-                success_rate = (success_count / total_count * 100) if total_count > 0 else 0
-                
-                # Calcular throughput
-                if download_time > 0:
-                    throughput = success_count / download_time
-                    logger.info(f"✅ Series {series_uid} completed: {success_count}/{total_count} instances ({success_rate:.0f}%) in {download_time:.2f}s ({throughput:.1f} inst/s)")
-                else:
-                    logger.info(f"✅ Series {series_uid} completed: {success_count}/{total_count} instances ({success_rate:.0f}%)")
-                
-                # Adicionar instâncias ao estudo usando add_instance()
-                for dataset in downloaded_instances:
-                    dicom_study.add_instance(dataset)
+            submit_downloads(max_workers)
+            
+            # Coletar resultados e repor a janela conforme os downloads terminam
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                submit_downloads(len(done))
                 
-                if not downloaded_instances:
-                    logger.warning(f"⚠️ No valid instances downloaded for series {series_uid}")
+                for future in done:
+                    study_uid = pending.pop(future)
+                    dataset = future.result()
+                    if dataset:
+                        dicom_studies[study_uid].add_instance(dataset)
+                        success_count += 1
+        else:
+            # Download sequencial otimizado
+            logger.info("🔄 Starting sequential download for %s instances", total_instances_count)
             
-            # Finalizar estudo
+            for study_uid, series_uid, sop_uid in instances:
+                dataset = download_dicom_instance(study_uid, series_uid, sop_uid, session)
+                if dataset:
+                    dicom_studies[study_uid].add_instance(dataset)
+                    success_count += 1
+        
+        download_time = time.time() - download_start
+        success_rate = (success_count / total_instances_count * 100) if total_instances_count > 0 else 0
+        
+        # Calcular throughput
+        if download_time > 0:
+            throughput = success_count / download_time
+            logger.info("✅ Download completed: %s/%s instances (%.0f%%) in %.2fs (%.1f inst/s)", success_count, total_instances_count, success_rate, download_time, throughput)
+        else:
+            logger.info("✅ Download completed: %s/%s instances (%.0f%%)", success_count, total_instances_count, success_rate)
+        
+        # 4. Finalizar estudos
+        studies = {}
+        for study_uid, dicom_study in dicom_studies.items():
             if dicom_study.series:
                 dicom_study.finalize()
                 studies[study_uid] = dicom_study
-                logger.info(f"🎯 Study {study_uid} completed: {len(dicom_study.series)} series")
+                logger.info("🎯 Study %s completed: %s series", study_uid, len(dicom_study.series))
             else:
-                logger.warning(f"⚠️ No valid series found for study {study_uid}")
+                logger.warning("⚠️ No valid series found for study %s", study_uid)
         
         total_time = time.time() - start_time
         
-        if studies:
+        if not studies:
+            logger.warning("⚠️ No studies processed successfully in %.2fs", total_time)
+        elif logger.isEnabledFor(logging.INFO):
+            # Métricas apenas quando o log INFO está ativo (percorre todas as instâncias)
             total_instances = sum(len(series.instances) for study in studies.values() for series in study.series.values())
             total_series = sum(len(study.series) for study in studies.values())
             
@@ -291,18 +436,16 @@ def process_dicom_wado_study(
             avg_throughput = total_instances / total_time if total_time > 0 else 0
             download_time = total_time - metadata_time
             
-            logger.info(f"🏁 DICOMweb processing completed in {total_time:.2f}s")
-            logger.info(f"📊 Performance metrics:")
-            logger.info(f"   • Total: {total_instances} instances from {total_series} series")
-            logger.info(f"   • Metadata: {metadata_time:.2f}s ({metadata_time/total_time*100:.1f}%)")
-            logger.info(f"   • Download: {download_time:.2f}s ({download_time/total_time*100:.1f}%)")
-            logger.info(f"   • Throughput: {avg_throughput:.1f} instances/sec")
-            logger.info(f"   • Workers: {max_workers} parallel threads")
-        else:
-            logger.warning(f"⚠️ No studies processed successfully in {total_time:.2f}s")
+            logger.info("🏁 DICOMweb processing completed in %.2fs", total_time)
+            logger.info("📊 Performance metrics:")
+            logger.info("   • Total: %s instances from %s series", total_instances, total_series)
+            logger.info("   • Metadata: %.2fs (%.1f%%)", metadata_time, metadata_time/total_time*100)
+            logger.info("   • Download: %.2fs (%.1f%%)", download_time, download_time/total_time*100)
+            logger.info("   • Throughput: %.1f instances/sec", avg_throughput)
+            logger.info("   • Workers: %s parallel threads", max_workers)
         
         return studies
         
     except Exception as e:
-        logger.error(f"❌ Error in DICOMweb WADO processing: {e}")
+        logger.error("❌ Error in DICOMweb WADO processing: %s", e)
         raise
\ No newline at end of file
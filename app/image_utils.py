@@ -3,16 +3,24 @@ Image processing utilities for DICOM to PIL conversion.
 Handles windowing, rescaling, and photometric interpretations.
 """
 
+import functools
+import itertools
 import logging
+import math
 import time
-from typing import Dict, Tuple, Any
+from io import BytesIO
+from typing import Dict, Iterator, Tuple, Any, Optional
 
 import numpy as np
 from PIL import Image
 import pydicom
 from pydicom import Dataset
+from pydicom.multival import MultiValue
+from pydicom.encaps import generate_pixel_data_frame
 from pydicom.pixel_data_handlers.util import apply_color_lut, apply_modality_lut, apply_voi_lut
 
+from ._kernels import alpha_over_white_u8, rescale_window_u8
+
 # Configure pydicom to use pylibjpeg handlers
 import pydicom.config
 pydicom.config.APPLY_J2K_CORRECTIONS = True
@@ -27,24 +35,66 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# JPEG 2000 Image Compression (Lossless Only) and JPEG 2000 Image Compression
+JPEG2000_TRANSFER_SYNTAXES = ('1.2.840.10008.1.2.4.90', '1.2.840.10008.1.2.4.91')
+
+# JPEG Baseline (Process 1)
+JPEG_BASELINE_TRANSFER_SYNTAX = '1.2.840.10008.1.2.4.50'
+
 
-def apply_rescale(pixel_array: np.ndarray, dataset: Dataset) -> np.ndarray:
+def apply_rescale(pixel_array: np.ndarray, slope: float = 1.0, intercept: float = 0.0) -> np.ndarray:
     """Apply rescale slope and intercept to pixel data."""
     try:
-        slope = getattr(dataset, 'RescaleSlope', 1.0)
-        intercept = getattr(dataset, 'RescaleIntercept', 0.0)
-        
         if slope != 1.0 or intercept != 0.0:
-            pixel_array = pixel_array * float(slope) + float(intercept)
+            # Single float32 copy, then in-place multiply/add (no extra temporaries)
+            pixel_array = pixel_array.astype(np.float32)
+            np.multiply(pixel_array, float(slope), out=pixel_array)
+            np.add(pixel_array, float(intercept), out=pixel_array)
         
         return pixel_array
     except Exception as e:
-        logger.warning(f"Error applying rescale: {e}")
+        logger.warning("Error applying rescale: %s", e)
         return pixel_array
 
 
-def apply_window(pixel_array: np.ndarray, window_center: float, window_width: float) -> np.ndarray:
-    """Apply window/level to pixel data."""
+def flatten_alpha(image: Image.Image) -> Image.Image:
+    """Composite an RGBA or LA image over a white background (RGBA -> RGB, LA -> L)."""
+    if alpha_over_white_u8 is not None:
+        src = np.asarray(image)
+        out = np.empty(src.shape[:2] + (src.shape[2] - 1,), dtype=np.uint8)
+        alpha_over_white_u8(src, out)
+        if image.mode == 'LA':
+            return Image.fromarray(out[:, :, 0], mode='L')
+        return Image.fromarray(out, mode='RGB')
+    
+    # Same for RGBA and LA: white background of the colour bands' mode, alpha as mask
+    background = Image.new(image.mode[:-1], image.size, 255 if image.mode == 'LA' else (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def _min_max_to_uint8(pixel_array: np.ndarray, pixel_min: float, pixel_max: float) -> np.ndarray:
+    """Linearly map [pixel_min, pixel_max] to 0-255 using a single float32 buffer."""
+    buffer = pixel_array.astype(np.float32)
+    np.subtract(buffer, float(pixel_min), out=buffer)
+    # Divide, then scale (same order and truncation as apply_window): the maximum
+    # becomes exactly 1.0 -> 255, where multiplying by 255 / range could give 254.99998
+    np.divide(buffer, float(pixel_max) - float(pixel_min), out=buffer)
+    np.multiply(buffer, 255.0, out=buffer)
+    return buffer.astype(np.uint8)
+
+
+def _cast_uint8(pixel_array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Cast to uint8, into the preallocated `out` buffer when one is given."""
+    if out is None:
+        return pixel_array.astype(np.uint8)
+    np.copyto(out, pixel_array, casting='unsafe')
+    return out
+
+
+def apply_window(pixel_array: np.ndarray, window_center: float, window_width: float,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply window/level to pixel data (written into the uint8 `out` buffer if given)."""
     try:
         # Calculate window bounds
         window_min = window_center - window_width / 2
@@ -59,23 +109,97 @@ def apply_window(pixel_array: np.ndarray, window_center: float, window_width: fl
         else:
             pixel_array = np.full_like(pixel_array, 128)
         
-        return pixel_array.astype(np.uint8)
+        return _cast_uint8(pixel_array, out)
     except Exception as e:
-        logger.warning(f"Error applying window: {e}")
+        logger.warning("Error applying window: %s", e)
         # Fallback: simple min-max normalization
         pixel_min, pixel_max = pixel_array.min(), pixel_array.max()
         if pixel_max != pixel_min:
             pixel_array = ((pixel_array - pixel_min) / (pixel_max - pixel_min) * 255)
         else:
             pixel_array = np.full_like(pixel_array, 128)
-        return pixel_array.astype(np.uint8)
+        return _cast_uint8(pixel_array, out)
 
 
-def auto_window(pixel_array: np.ndarray) -> Tuple[float, float]:
-    """Automatically determine window center and width."""
+@functools.lru_cache(maxsize=32)
+def _window_lut(dtype_str: str, slope: float, intercept: float,
+                window_center: float, window_width: float, invert: bool) -> np.ndarray:
+    """
+    Build a uint8 lookup table covering every value of an 8/16-bit integer dtype.
+    
+    Entries are computed with the same rescale + apply_window math as the array
+    path. Cached so all frames/instances of a series share a single table.
+    """
+    dtype = np.dtype(dtype_str)
+    # Every bit pattern of the dtype, indexed by its unsigned representation
+    index_dtype = np.uint8 if dtype.itemsize == 1 else np.uint16
+    values = np.arange(1 << (8 * dtype.itemsize)).astype(index_dtype).view(dtype)
+    
+    lut = apply_window(values * slope + intercept, window_center, window_width)
+    if invert:
+        np.subtract(255, lut, out=lut)
+    return lut
+
+
+def rescale_window_to_uint8(pixel_array: np.ndarray, slope: float, intercept: float,
+                            window_center: float, window_width: float,
+                            invert: bool = False, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Apply rescale slope/intercept and window/level (optionally inverted), producing uint8 pixel data.
+    
+    If `out` is given (uint8, same shape) the result is written into it, so callers
+    converting many frames can reuse a single buffer.
+    """
+    window_min = window_center - window_width / 2
+    window_max = window_center + window_width / 2
+    
+    if rescale_window_u8 is not None and window_max != window_min:
+        # Fused JIT kernel: one read and one write per pixel. It writes through
+        # out.ravel(), which is a copy (not a view) unless out is C-contiguous uint8
+        if (out is not None and out.dtype == np.uint8 and out.flags.c_contiguous
+                and out.shape == pixel_array.shape):
+            rescale_window_u8(np.ascontiguousarray(pixel_array), slope, intercept, window_min, window_max, out)
+        else:
+            buffer = np.empty(pixel_array.shape, dtype=np.uint8)
+            rescale_window_u8(np.ascontiguousarray(pixel_array), slope, intercept, window_min, window_max, buffer)
+            if out is None:
+                out = buffer
+            else:
+                np.copyto(out, buffer, casting='unsafe')
+    elif pixel_array.dtype in (np.uint8, np.int8, np.uint16, np.int16):
+        # 8/16-bit integer data: the whole pipeline is a function of the stored
+        # value, so a single table gather replaces all the float passes
+        lut = _window_lut(pixel_array.dtype.str, slope, intercept, window_center, window_width, invert)
+        index_dtype = np.uint8 if pixel_array.dtype.itemsize == 1 else np.uint16
+        return np.take(lut, pixel_array.view(index_dtype), out=out)
+    else:
+        # Pure numpy path
+        if slope != 1.0 or intercept != 0.0:
+            pixel_array = pixel_array * slope + intercept
+        out = apply_window(pixel_array, window_center, window_width, out=out)
+    
+    if invert:
+        np.subtract(255, out, out=out)
+    return out
+
+
+def auto_window(pixel_array: np.ndarray, slope: float = 1.0, intercept: float = 0.0) -> Tuple[float, float]:
+    """
+    Automatically determine window center and width.
+    
+    The window is computed on the stored values and mapped through the (linear)
+    rescale, so callers don't need to materialize the rescaled array first.
+    """
     try:
-        # Calculate percentiles for robust windowing
-        p2, p98 = np.percentile(pixel_array, [2, 98])
+        # Calculate percentiles for robust windowing (O(N) selection instead of a full sort)
+        flat = pixel_array.ravel()
+        if flat.size > 1_000_000:
+            # Strided subsample (~65k pixels) is stable for smooth histograms
+            flat = flat[::flat.size // 65536]
+        k2 = int(0.02 * (flat.size - 1))
+        k98 = int(0.98 * (flat.size - 1))
+        partitioned = np.partition(flat, [k2, k98])
+        p2, p98 = float(partitioned[k2]), float(partitioned[k98])
         
         window_center = (p2 + p98) / 2
         window_width = p98 - p2
@@ -84,93 +208,182 @@ def auto_window(pixel_array: np.ndarray) -> Tuple[float, float]:
         if window_width < 1:
             window_width = max(1, pixel_array.max() - pixel_array.min())
         
-        return float(window_center), float(window_width)
+        return float(window_center) * slope + intercept, max(1.0, float(window_width) * abs(slope))
     except Exception:
         # Fallback to simple min-max
         pixel_min, pixel_max = pixel_array.min(), pixel_array.max()
         center = (pixel_min + pixel_max) / 2
         width = max(1, pixel_max - pixel_min)
-        return float(center), float(width)
+        return float(center) * slope + intercept, max(1.0, float(width) * abs(slope))
+
 
+def _j2k_precision(frame: bytes) -> Optional[int]:
+    """Bit depth of the first component, read from the codestream SIZ marker."""
+    siz = frame.find(b'\xff\x51')
+    # marker(2) Lsiz(2) Rsiz(2) 8 x 4-byte sizes Csiz(2), then Ssiz of component 0
+    if siz < 0 or len(frame) <= siz + 40:
+        return None
+    return (frame[siz + 40] & 0x7F) + 1
 
-def dicom_to_pil(dataset: Dataset, frame_index: int = 0) -> Tuple[Image.Image, Dict[str, Any]]:
+
+def decode_reduced_frame(dataset: Dataset, frame_index: int,
+                         target_size: Tuple[int, int]) -> Optional[np.ndarray]:
+    """
+    Decode a single frame at a lower resolution when the codec supports it.
+    
+    JPEG 2000 stores a multi-resolution (DWT) pyramid, so a downsized image can be
+    decoded directly from a lower resolution level. Only unsigned monochrome
+    JPEG 2000 is handled; returns None when a regular full decode is required.
+    """
+    try:
+        file_meta = getattr(dataset, 'file_meta', None)
+        transfer_syntax = getattr(file_meta, 'TransferSyntaxUID', None)
+        if transfer_syntax not in JPEG2000_TRANSFER_SYNTAXES:
+            return None
+        if getattr(dataset, 'SamplesPerPixel', 1) != 1 or getattr(dataset, 'PixelRepresentation', 0) != 0:
+            return None
+        
+        # Number of halvings that still keeps the image at or above the target size
+        scale = max(int(dataset.Columns) / target_size[0], int(dataset.Rows) / target_size[1])
+        if scale < 2:
+            return None
+        reduce = int(math.log2(scale))
+        
+        num_frames = int(getattr(dataset, 'NumberOfFrames', 1) or 1)
+        frames = generate_pixel_data_frame(dataset.PixelData, num_frames)
+        frame = next(itertools.islice(frames, frame_index, None))
+        
+        with Image.open(BytesIO(frame)) as j2k_image:
+            j2k_image.reduce = reduce
+            j2k_image.load()
+            pixel_array = np.asarray(j2k_image)
+        
+        # Pillow scales samples below 16 bits up to 16 bits (4095 -> 65520); shift
+        # back to the codestream precision so the DICOM window still applies
+        if pixel_array.dtype == np.uint16:
+            precision = _j2k_precision(frame) or int(getattr(dataset, 'BitsStored', 16) or 16)
+            if precision < 16:
+                pixel_array = pixel_array >> (16 - precision)
+        
+        logger.debug("Reduced JPEG 2000 decode (1/%s): shape %s", 2 ** reduce, pixel_array.shape)
+        return pixel_array
+    except Exception as e:
+        logger.debug("Reduced decode not available, falling back to full decode: %s", e)
+        return None
+
+
+def encapsulated_jpeg_frames(dataset: Dataset,
+                             target_size: Optional[Tuple[int, int]] = None) -> Optional[Iterator[bytes]]:
+    """
+    Return the stored JPEG stream of each frame when it can be embedded as-is.
+    
+    Only 8-bit YBR JPEG Baseline qualifies: colour images are not windowed, so
+    decoding would give exactly the pixels the JPEG already holds, and PDF viewers
+    apply the same YCbCr transform. Images larger than target_size still go
+    through dicom_to_pil to be downsized. Returns None when a decode is required.
+    """
+    try:
+        file_meta = getattr(dataset, 'file_meta', None)
+        if getattr(file_meta, 'TransferSyntaxUID', None) != JPEG_BASELINE_TRANSFER_SYNTAX:
+            return None
+        if dataset.get('PhotometricInterpretation') not in ('YBR_FULL', 'YBR_FULL_422'):
+            return None
+        if dataset.get('SamplesPerPixel') != 3 or dataset.get('BitsAllocated') != 8:
+            return None
+        if target_size is not None and (int(dataset.Columns) > target_size[0] or int(dataset.Rows) > target_size[1]):
+            return None
+        
+        num_frames = int(dataset.get('NumberOfFrames', 1) or 1)
+        return generate_pixel_data_frame(dataset.PixelData, num_frames)
+    except Exception as e:
+        logger.debug("JPEG pass-through not available, falling back to decode: %s", e)
+        return None
+
+
+def dicom_to_pil(dataset: Dataset, frame_index: int = 0,
+                 target_size: Optional[Tuple[int, int]] = None,
+                 out: Optional[np.ndarray] = None) -> Tuple[Image.Image, Dict[str, Any]]:
     """
     Convert DICOM dataset to PIL Image.
     
     Args:
         dataset: DICOM dataset
         frame_index: Frame index for multi-frame images
+        target_size: Optional (width, height) bounding box; the image is decoded
+            at reduced resolution when possible and downsized to fit
+        out: Optional uint8 (Rows, Columns) buffer that monochrome frames are
+            windowed into; the returned image may share its memory
         
     Returns:
         Tuple of (PIL Image, metadata dict)
     """
     start_time = time.time()
     try:
-        # Force decompression if needed (only if dataset has file_meta)
-        if hasattr(dataset, 'file_meta'):
-            try:
-                dataset.decompress()
-            except Exception as e:
-                logger.debug(f"Decompression not needed or failed: {e}")
-        
-        # Get pixel array
-        pixel_start = time.time()
-        pixel_array = dataset.pixel_array
-        pixel_time = time.time() - pixel_start
+        # Read every tag once up front instead of repeated hasattr/getattr keyword lookups
+        ds_get = dataset.get
+        photometric = ds_get('PhotometricInterpretation', 'MONOCHROME2')
+        num_frames = int(ds_get('NumberOfFrames', 1) or 1)
+        wc = ds_get('WindowCenter')
+        ww = ds_get('WindowWidth')
+        slope = float(ds_get('RescaleSlope') or 1.0)
+        intercept = float(ds_get('RescaleIntercept') or 0.0)
         
-        # Only log pixel extraction time for very slow cases (>0.1s)
-        if pixel_time > 0.1:
-            logger.debug(f"⏱️ Slow pixel array extraction: {pixel_time:.3f}s, shape: {pixel_array.shape}")
+        # Skip the full decode when a smaller resolution level is enough
+        pixel_array = None
+        if target_size is not None:
+            pixel_array = decode_reduced_frame(dataset, frame_index, target_size)
         
-        # Get photometric interpretation early
-        photometric = getattr(dataset, 'PhotometricInterpretation', 'MONOCHROME2')
-        logger.debug(f"Processing {photometric} image, shape: {pixel_array.shape}, dtype: {pixel_array.dtype}")
+        if pixel_array is None:
+            # Get pixel array (pydicom decodes compressed transfer syntaxes on access)
+            pixel_start = time.time()
+            pixel_array = dataset.pixel_array
+            pixel_time = time.time() - pixel_start
+            
+            # Only log pixel extraction time for very slow cases (>0.1s)
+            if pixel_time > 0.1:
+                logger.debug("⏱️ Slow pixel array extraction: %.3fs, shape: %s", pixel_time, pixel_array.shape)
+            
+            # Handle multi-frame images
+            if num_frames > 1:
+                if frame_index >= pixel_array.shape[0]:
+                    raise ValueError(f"Frame index {frame_index} out of range (max: {pixel_array.shape[0]-1})")
+                pixel_array = pixel_array[frame_index]
+                logger.debug("Extracted frame %s/%s, new shape: %s", frame_index, num_frames, pixel_array.shape)
         
-        # Handle multi-frame images
-        num_frames = getattr(dataset, 'NumberOfFrames', 1)
-        if num_frames > 1:
-            if frame_index >= pixel_array.shape[0]:
-                raise ValueError(f"Frame index {frame_index} out of range (max: {pixel_array.shape[0]-1})")
-            pixel_array = pixel_array[frame_index]
-            logger.debug(f"Extracted frame {frame_index}/{num_frames}, new shape: {pixel_array.shape}")
+        logger.debug("Processing %s image, shape: %s, dtype: %s", photometric, pixel_array.shape, pixel_array.dtype)
         
         # Get window parameters before processing
         window_center = None
         window_width = None
         
-        if hasattr(dataset, 'WindowCenter') and hasattr(dataset, 'WindowWidth'):
+        if wc is not None and ww is not None:
             try:
-                wc = dataset.WindowCenter
-                ww = dataset.WindowWidth
                 # Handle multiple windows (take first)
-                if isinstance(wc, (list, tuple)):
+                if isinstance(wc, (list, tuple, MultiValue)):
                     wc = wc[0]
-                if isinstance(ww, (list, tuple)):
+                if isinstance(ww, (list, tuple, MultiValue)):
                     ww = ww[0]
                 window_center = float(wc)
                 window_width = float(ww)
-                logger.debug(f"Using DICOM window: C={window_center}, W={window_width}")
+                logger.debug("Using DICOM window: C=%s, W=%s", window_center, window_width)
             except (ValueError, TypeError, IndexError) as e:
-                logger.warning(f"Error reading window parameters: {e}")
+                logger.warning("Error reading window parameters: %s", e)
         
         # Process based on photometric interpretation
         if photometric in ['MONOCHROME1', 'MONOCHROME2']:
             # Grayscale image processing
-            
-            # Apply rescale slope/intercept
-            pixel_array = apply_rescale(pixel_array, dataset)
-            
             # Auto-window if no window parameters
             if window_center is None or window_width is None:
-                window_center, window_width = auto_window(pixel_array)
-                logger.debug(f"Auto-calculated window: C={window_center:.1f}, W={window_width:.1f}")
+                window_center, window_width = auto_window(pixel_array, slope, intercept)
+                logger.debug("Auto-calculated window: C=%.1f, W=%.1f", window_center, window_width)
             
-            # Apply windowing
-            pixel_array = apply_window(pixel_array, window_center, window_width)
-            
-            # Invert for MONOCHROME1
-            if photometric == 'MONOCHROME1':
-                pixel_array = 255 - pixel_array
+            # Apply rescale slope/intercept and windowing in a single pass (inverted for MONOCHROME1)
+            if out is not None and out.shape != pixel_array.shape:
+                out = None  # e.g. reduced-resolution decode
+            pixel_array = rescale_window_to_uint8(
+                pixel_array, slope, intercept, window_center, window_width,
+                invert=(photometric == 'MONOCHROME1'), out=out
+            )
             
             image = Image.fromarray(pixel_array, mode='L')
             
@@ -179,16 +392,16 @@ def dicom_to_pil(dataset: Dataset, frame_index: int = 0) -> Tuple[Image.Image, D
             
             # Ensure proper shape (height, width, 3)
             if len(pixel_array.shape) != 3 or pixel_array.shape[2] != 3:
-                logger.error(f"Invalid RGB shape: {pixel_array.shape}")
+                logger.error("Invalid RGB shape: %s", pixel_array.shape)
                 raise ValueError(f"Invalid RGB image shape: {pixel_array.shape}")
             
             # Convert to uint8 if needed
             if pixel_array.dtype != np.uint8:
-                logger.debug(f"Converting from {pixel_array.dtype} to uint8")
+                logger.debug("Converting from %s to uint8", pixel_array.dtype)
                 pixel_min = pixel_array.min()
                 pixel_max = pixel_array.max()
                 if pixel_max > pixel_min:
-                    pixel_array = ((pixel_array - pixel_min) / (pixel_max - pixel_min) * 255).astype(np.uint8)
+                    pixel_array = _min_max_to_uint8(pixel_array, pixel_min, pixel_max)
                 else:
                     pixel_array = pixel_array.astype(np.uint8)
             
@@ -198,26 +411,11 @@ def dicom_to_pil(dataset: Dataset, frame_index: int = 0) -> Tuple[Image.Image, D
             else:
                 # YBR to RGB conversion
                 # YBR_FULL and YBR_FULL_422 need color space conversion
-                logger.debug(f"Converting {photometric} to RGB")
-                
-                # Extract Y, Cb, Cr channels
-                Y = pixel_array[:, :, 0].astype(np.float32)
-                Cb = pixel_array[:, :, 1].astype(np.float32) - 128
-                Cr = pixel_array[:, :, 2].astype(np.float32) - 128
+                logger.debug("Converting %s to RGB", photometric)
                 
-                # Convert YCbCr to RGB
-                R = Y + 1.402 * Cr
-                G = Y - 0.344136 * Cb - 0.714136 * Cr
-                B = Y + 1.772 * Cb
-                
-                # Clip and convert to uint8
-                R = np.clip(R, 0, 255).astype(np.uint8)
-                G = np.clip(G, 0, 255).astype(np.uint8)
-                B = np.clip(B, 0, 255).astype(np.uint8)
-                
-                # Stack channels
-                rgb_array = np.stack([R, G, B], axis=2)
-                image = Image.fromarray(rgb_array, mode='RGB')
+                # Pillow's YCbCr is JPEG/JFIF full-range ITU-R BT.601, the same
+                # coefficients DICOM uses for YBR_FULL, converted in a single C loop
+                image = Image.fromarray(pixel_array, mode='YCbCr').convert('RGB')
         
         elif photometric == 'PALETTE COLOR':
             # Palette color images
@@ -232,29 +430,33 @@ def dicom_to_pil(dataset: Dataset, frame_index: int = 0) -> Tuple[Image.Image, D
                     pixel_min = pixel_array.min()
                     pixel_max = pixel_array.max()
                     if pixel_max > pixel_min:
-                        pixel_array = ((pixel_array - pixel_min) / (pixel_max - pixel_min) * 255).astype(np.uint8)
+                        pixel_array = _min_max_to_uint8(pixel_array, pixel_min, pixel_max)
                     else:
                         pixel_array = pixel_array.astype(np.uint8)
                 
                 image = Image.fromarray(pixel_array, mode='RGB')
             except Exception as e:
-                logger.error(f"Error applying color LUT: {e}")
+                logger.error("Error applying color LUT: %s", e)
                 # Fallback to grayscale
-                pixel_array = apply_rescale(pixel_array, dataset)
+                pixel_array = apply_rescale(pixel_array, slope, intercept)
                 if window_center is None or window_width is None:
                     window_center, window_width = auto_window(pixel_array)
                 pixel_array = apply_window(pixel_array, window_center, window_width)
                 image = Image.fromarray(pixel_array, mode='L')
         
         else:
-            logger.warning(f"Unsupported photometric interpretation: {photometric}, treating as MONOCHROME2")
+            logger.warning("Unsupported photometric interpretation: %s, treating as MONOCHROME2", photometric)
             # Fallback to grayscale processing
-            pixel_array = apply_rescale(pixel_array, dataset)
+            pixel_array = apply_rescale(pixel_array, slope, intercept)
             if window_center is None or window_width is None:
                 window_center, window_width = auto_window(pixel_array)
             pixel_array = apply_window(pixel_array, window_center, window_width)
             image = Image.fromarray(pixel_array, mode='L')
         
+        # Downsize to the requested bounding box (no-op if already smaller)
+        if target_size is not None:
+            image.thumbnail(target_size, Image.Resampling.LANCZOS)
+        
         # Metadata for PDF generation
         metadata = {
             'window_center': window_center,
@@ -267,34 +469,64 @@ def dicom_to_pil(dataset: Dataset, frame_index: int = 0) -> Tuple[Image.Image, D
         
         # Only log conversion time for slow cases (>0.1s)
         if total_time > 0.1:
-            logger.debug(f"⏱️ Slow DICOM to PIL conversion: {total_time:.3f}s")
+            logger.debug("⏱️ Slow DICOM to PIL conversion: %.3fs", total_time)
         
         return image, metadata
         
     except Exception as e:
-        logger.error(f"Error converting DICOM to PIL: {e}", exc_info=True)
+        logger.error("Error converting DICOM to PIL: %s", e, exc_info=True)
         # Return a blank white image as fallback (not black!)
         blank_image = Image.new('L', (512, 512), 128)  # Gray instead of black
         return blank_image, {'error': str(e)}
 
 
+def dicom_to_pil_frames(dataset: Dataset,
+                        target_size: Optional[Tuple[int, int]] = None,
+                        frame_count: Optional[int] = None) -> Iterator[Tuple[Image.Image, Dict[str, Any]]]:
+    """
+    Convert every frame of a DICOM dataset, yielding (PIL Image, metadata) tuples.
+    
+    frame_count may be passed when the caller already knows it (defaults to get_frame_count).
+    
+    Monochrome frames are windowed into a single reused uint8 buffer and
+    Image.fromarray shares that memory, so each yielded image is only valid until
+    the next iteration - call image.copy() if it must outlive it.
+    """
+    buffer = np.empty((int(dataset.Rows), int(dataset.Columns)), dtype=np.uint8)
+    if frame_count is None:
+        frame_count = get_frame_count(dataset)
+    for frame_index in range(frame_count):
+        yield dicom_to_pil(dataset, frame_index, target_size, out=buffer)
+
+
+def frame_count_from_metadata(dataset: Dataset) -> int:
+    """
+    Get the number of frames from the header only, without decoding PixelData.
+    
+    Uses NumberOfFrames, then the length of PerFrameFunctionalGroupsSequence
+    (enhanced multi-frame objects), and falls back to a single frame.
+    """
+    try:
+        num_frames = int(dataset.get('NumberOfFrames') or 0)
+        if num_frames > 0:
+            return num_frames
+        per_frame = dataset.get('PerFrameFunctionalGroupsSequence')
+        if per_frame:
+            return len(per_frame)
+    except (TypeError, ValueError):
+        pass
+    return 1
+
+
 def get_frame_count(dataset: Dataset) -> int:
-    """Get the number of frames in a DICOM dataset."""
+    """
+    Get the number of frames in a DICOM dataset.
+    
+    Reads NumberOfFrames only (missing or 1 means a single frame), the same tag
+    pydicom uses to split PixelData into frames. Never touches pixel_array: a
+    full decode here would defeat the reduced-resolution path in dicom_to_pil.
+    """
     try:
-        # Check NumberOfFrames attribute first
-        if hasattr(dataset, 'NumberOfFrames') and dataset.NumberOfFrames > 1:
-            return int(dataset.NumberOfFrames)
-        
-        pixel_array = dataset.pixel_array
-        if len(pixel_array.shape) > 2:
-            # Check if this is a color image (last dimension is 3)
-            if pixel_array.shape[-1] == 3:
-                # This is a color image, not multi-frame
-                return 1
-            # Check if first dimension looks like frames (small number compared to image dimensions)
-            elif pixel_array.shape[0] < 100 and pixel_array.shape[0] < pixel_array.shape[1]:
-                return pixel_array.shape[0]
-        
-        return 1
-    except Exception:
+        return max(1, int(dataset.get('NumberOfFrames') or 1))
+    except (TypeError, ValueError):
         return 1
@@ -1,22 +1,48 @@
 """
 FastAPI application for converting DICOM images to PDF via DICOMweb WADO.
 """
+import asyncio
 import base64
+import functools
+import gzip
+import ipaddress
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+import threading
 import time
-from typing import Dict, Optional, Union, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, Union, Any
 
 import httpx
-import requests
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Header, BackgroundTasks, Request, status
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from .dicomweb_utils import process_dicom_wado_study
 from .pdf_utils import create_pdf_from_studies
 
+# Serializador JSON acelerado (opcional) - gera bytes diretamente
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available (bytes out, no str re-encode)."""
+    
+    def render(self, content: Any) -> bytes:
+        return _json_dumps(content)
+
 # Load environment variables
 load_dotenv()
 
@@ -27,20 +53,178 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(
-    title="DICOM to PDF Converter",
-    description="Convert DICOM images to PDF documents via DICOMweb WADO",
-    version="1.0.0"
-)
+# Sem introspecção de thread/processo por registro (não usados no formato)
+logging.logThreads = False
+logging.logProcesses = False
 
-@app.on_event("startup")
-async def startup_event():
-    """Log environment variables on startup."""
-    logger.info("=" * 80)
-    logger.info("🚀 DICOM to PDF Converter API - Starting Up")
-    logger.info("=" * 80)
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops records below WARNING when the queue is full instead of blocking.
+    
+    WARNING and above wait up to block_timeout seconds for room, then go straight
+    to logging.lastResort (stderr), so they are never lost. Dropped records are
+    counted; the listener reports the count when it drains (take_dropped).
+    """
+    
+    def __init__(self, queue, block_timeout: float = 1.0):
+        super().__init__(queue)
+        self.block_timeout = block_timeout
+        self.dropped = 0
     
-    # Log critical environment variables
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if record.levelno >= logging.WARNING:
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                if logging.lastResort is not None:
+                    logging.lastResort.handle(record)
+            return
+        # enqueue runs inside Handler.handle, under self.lock
+        self.dropped += 1
+    
+    def take_dropped(self) -> int:
+        """Return the number of records dropped since the last call and reset it."""
+        self.acquire()
+        try:
+            dropped, self.dropped = self.dropped, 0
+        finally:
+            self.release()
+        return dropped
+
+class BatchingQueueListener:
+    """
+    Queue listener thread that drains records in batches.
+    
+    After the first record arrives it keeps collecting until the batch reaches
+    30% of the queue capacity or max_wait seconds pass, then writes the whole
+    batch to each stream handler as a single write + flush instead of one per record.
+    
+    Same start()/stop()/handlers interface as logging.handlers.QueueListener, but
+    runs its own loop over queue.get and Handler.handle instead of overriding the
+    stdlib listener's private internals (which change between Python versions).
+    """
+    
+    _sentinel = object()
+    
+    def __init__(self, queue, *handlers, respect_handler_level: bool = False, max_wait: float = 1.0,
+                 queue_handler: Optional[DroppingQueueHandler] = None):
+        self.queue = queue
+        self.handlers = handlers
+        self.respect_handler_level = respect_handler_level
+        self.batch_size = max(1, int((queue.maxsize or 1000) * 0.3))
+        self.max_wait = max_wait
+        # Handler feeding the queue, asked after each batch for records it had to drop
+        self.queue_handler = queue_handler
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start the thread that writes the queued records."""
+        self._thread = threading.Thread(target=self._run, name='log-queue-listener', daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Write every record still queued, then stop the thread."""
+        if self._thread is None:
+            return
+        # Blocking put: the sentinel must get in even when the queue is momentarily full
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+    
+    def _collect_batch(self) -> list:
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size and batch[-1] is not self._sentinel:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _emit_batch(self, records: list) -> None:
+        for handler in self.handlers:
+            if not isinstance(handler, logging.StreamHandler):
+                for record in records:
+                    if not self.respect_handler_level or record.levelno >= handler.level:
+                        handler.handle(record)
+                continue
+            
+            lines = []
+            for record in records:
+                if self.respect_handler_level and record.levelno < handler.level:
+                    continue
+                if not handler.filter(record):
+                    continue
+                try:
+                    lines.append(handler.format(record) + handler.terminator)
+                except Exception:
+                    handler.handleError(record)
+            if not lines:
+                continue
+            
+            handler.acquire()
+            try:
+                handler.stream.write(''.join(lines))
+                handler.flush()
+            except Exception:
+                handler.handleError(records[-1])
+            finally:
+                handler.release()
+    
+    def _report_dropped(self) -> None:
+        dropped = self.queue_handler.take_dropped() if self.queue_handler is not None else 0
+        if dropped:
+            self._emit_batch([logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "⚠️ %s log records below WARNING dropped (log queue full)", (dropped,), None
+            )])
+    
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            stop = batch[-1] is self._sentinel
+            records = batch[:-1] if stop else batch
+            if records:
+                # QueueHandler.prepare already merged msg/args, nothing left to prepare here
+                self._emit_batch(records)
+            self._report_dropped()
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                break
+
+def start_queue_logging(maxsize: int = 10000) -> BatchingQueueListener:
+    """
+    Route root-logger records through a queue so log calls are a non-blocking enqueue.
+    
+    The handlers configured by basicConfig move to a listener thread, which
+    does the actual stream writes. Call .stop() on the returned listener at shutdown.
+    """
+    root = logging.getLogger()
+    log_queue = queue.Queue(maxsize=maxsize)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = BatchingQueueListener(log_queue, *root.handlers, respect_handler_level=True,
+                                     queue_handler=queue_handler)
+    root.handlers = [queue_handler]
+    listener.start()
+    return listener
+
+def stop_queue_logging(listener: BatchingQueueListener) -> None:
+    """Flush the queue and restore the original handlers on the root logger."""
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
+
+async def startup_event():
+    """Log environment configuration and validation on startup as a single structured record."""
+    # Critical environment variables
     env_vars = {
         "DICOM_WADO_URL": os.getenv('DICOM_WADO_URL'),
         "CREATE_LOG_URL": os.getenv('CREATE_LOG_URL'),
@@ -49,44 +233,104 @@ async def startup_event():
         "LOG_LEVEL": os.getenv('LOG_LEVEL', 'INFO'),
         "DEFAULT_MAX_WORKERS": os.getenv('DEFAULT_MAX_WORKERS', '4'),
         "MAX_ALLOWED_WORKERS": os.getenv('MAX_ALLOWED_WORKERS', '8'),
+        "PDF_PROCESS_WORKERS": os.getenv('PDF_PROCESS_WORKERS', str(os.cpu_count() or 1)),
+        "DICOM_WADO_BULK": os.getenv('DICOM_WADO_BULK', '0'),
         "ALLOWED_CLIENT_IPS": os.getenv('ALLOWED_CLIENT_IPS', 'None (all IPs allowed)'),
     }
     
-    logger.info("📋 Environment Configuration:")
+    # Mask sensitive parts of URLs; unset values are reported as null
+    display_env = {}
     for key, value in env_vars.items():
-        if value:
-            # Mask sensitive parts of URLs
-            display_value = value
-            if 'URL' in key and value and len(value) > 40:
-                display_value = value[:30] + "..." + value[-10:]
-            logger.info(f"  ✓ {key}: {display_value}")
-        else:
-            logger.warning(f"  ✗ {key}: NOT SET")
+        if value and 'URL' in key and len(value) > 40:
+            value = value[:30] + "..." + value[-10:]
+        display_env[key] = value or None
     
     # Validate critical configurations
-    logger.info("=" * 80)
-    logger.info("🔍 Validation:")
+    allowed_ips = [ip.strip() for ip in os.getenv('ALLOWED_CLIENT_IPS', '').split(',') if ip.strip()]
+    validation = {
+        "dicom_wado_url_configured": bool(os.getenv('DICOM_WADO_URL')),
+        "external_logging_enabled": bool(os.getenv('CREATE_LOG_URL')),
+        "ip_validation_enabled": bool(allowed_ips),
+        "allowed_ips_count": len(allowed_ips),
+    }
     
-    if not os.getenv('DICOM_WADO_URL'):
-        logger.error("  ❌ DICOM_WADO_URL is not configured! API will not work properly.")
+    # One record at the most severe level found (DICOM_WADO_URL missing = API won't work)
+    if not validation["dicom_wado_url_configured"]:
+        level = logging.ERROR
+    elif not validation["external_logging_enabled"] or not validation["ip_validation_enabled"]:
+        level = logging.WARNING
     else:
-        logger.info("  ✅ DICOM_WADO_URL is configured")
+        level = logging.INFO
     
-    if not os.getenv('CREATE_LOG_URL'):
-        logger.warning("  ⚠️  CREATE_LOG_URL is not configured - external logging disabled")
-    else:
-        logger.info("  ✅ CREATE_LOG_URL is configured")
+    startup_data = {"event": "startup", "env": display_env, "validation": validation}
+    logger.log(
+        level,
+        "🚀 DICOM to PDF Converter API startup: %s",
+        _json_dumps(startup_data).decode('utf-8'),
+        extra={"data": startup_data}
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: startup logging and shared HTTP clients."""
+    log_listener = start_queue_logging()
+    await startup_event()
     
-    allowed_ips = os.getenv('ALLOWED_CLIENT_IPS', '').strip()
-    if allowed_ips:
-        ip_list = [ip.strip() for ip in allowed_ips.split(',') if ip.strip()]
-        logger.info(f"  ✅ IP Validation enabled - {len(ip_list)} allowed IPs")
-    else:
-        logger.warning("  ⚠️  IP Validation disabled - all IPs allowed")
+    # Configuração lida uma única vez (em vez de os.getenv + split a cada requisição)
+    app.state.allowed_ips = frozenset(
+        ip.strip() for ip in os.getenv('ALLOWED_CLIENT_IPS', '').split(',') if ip.strip()
+    )
+    app.state.allowed_networks = build_ip_allowlist(app.state.allowed_ips)
+    app.state.create_log_url = os.getenv('CREATE_LOG_URL')
+    app.state.dicom_wado_url = os.getenv('DICOM_WADO_URL')
+    app.state.callback_gzip = os.getenv('CALLBACK_GZIP', '0') == '1'
     
-    logger.info("=" * 80)
-    logger.info("✅ Startup completed successfully")
-    logger.info("=" * 80)
+    # Cliente HTTP compartilhado para os logs externos (keep-alive, sem handshake por chamada)
+    app.state.log_client = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+    )
+    # Pool de processos para download + geração do PDF (CPU-bound, fora do event loop)
+    app.state.pdf_pool = create_pdf_pool()
+    app.state.pdf_pool_lock = asyncio.Lock()
+    
+    # Cliente único para os callbacks de PDF (HTTP/2 quando o servidor suportar)
+    app.state.callback_client = httpx.AsyncClient(
+        timeout=30.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50)
+    )
+    app.state.processing_lock = asyncio.Lock()
+    sweeper = asyncio.create_task(sweep_processed_requests_periodically())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        # Aguarda logs externos ainda pendentes antes de fechar o cliente
+        if _log_tasks:
+            await asyncio.gather(*_log_tasks, return_exceptions=True)
+        await app.state.callback_client.aclose()
+        await app.state.log_client.aclose()
+        app.state.pdf_pool.shutdown(wait=True)
+        stop_queue_logging(log_listener)
+
+app = FastAPI(
+    title="DICOM to PDF Converter",
+    description="Convert DICOM images to PDF documents via DICOMweb WADO",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
+)
+
+# Compressão das respostas (nível 1: ~1/3 da CPU do nível padrão, quase a mesma taxa).
+# PDF já vem com as imagens em JPEG: gzip só gastaria CPU, então fica de fora
+try:
+    from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+    _GZIP_OPTIONS = {'exclude_content_types': DEFAULT_EXCLUDED_CONTENT_TYPES + ('application/pdf',)}
+except ImportError:
+    # Starlette antigo: sem lista de exclusão configurável
+    _GZIP_OPTIONS = {}
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1, **_GZIP_OPTIONS)
 
 class RenderRequest(BaseModel):
     """Request model for DICOM to PDF conversion via DICOMweb WADO."""
@@ -100,6 +344,7 @@ class RenderRequest(BaseModel):
     UrlCallback: str
     anonymize: bool = False
     cover_page: bool = False
+    cover_page_summary: bool = True
     max_workers: int = 4
 
 class RenderRequestSync(BaseModel):
@@ -109,6 +354,7 @@ class RenderRequestSync(BaseModel):
     IntegrationToken: str
     anonymize: Optional[bool] = False
     cover_page: Optional[bool] = False
+    cover_page_summary: Optional[bool] = True
     max_workers: Optional[int] = 4
 
 class CallbackPayloadSantana(BaseModel):
@@ -127,10 +373,49 @@ class CallbackErrorPayload(BaseModel):
     examID: int
     error: Dict[str, Union[str, int]]
 
-# In-memory tracking to prevent duplicate processing
-processed_requests = set()
+# In-memory tracking to prevent duplicate processing: process_key -> start time (monotonic).
+# Entries older than the TTL are treated as stale and swept periodically, so memory stays
+# bounded even if a key is never removed.
+PROCESSING_TTL_SECONDS = 3600
+PROCESSING_SWEEP_INTERVAL_SECONDS = 300
+processed_requests: Dict[str, float] = {}
+
+def sweep_processed_requests() -> int:
+    """Drop processing keys older than PROCESSING_TTL_SECONDS. Returns how many were removed."""
+    cutoff = time.monotonic() - PROCESSING_TTL_SECONDS
+    expired = [key for key, started in processed_requests.items() if started < cutoff]
+    for key in expired:
+        del processed_requests[key]
+    return len(expired)
+
+async def claim_process_key(process_key: str) -> bool:
+    """
+    Atomically check-and-add a processing key. Returns False if it is already in progress.
+    
+    Stale entries past the TTL don't block. The lock keeps the check and the add
+    together even if an await is ever introduced between them; deduplication is
+    per process, so each uvicorn worker keeps its own set.
+    """
+    async with app.state.processing_lock:
+        started = processed_requests.get(process_key)
+        if started is not None and time.monotonic() - started < PROCESSING_TTL_SECONDS:
+            return False
+        processed_requests[process_key] = time.monotonic()
+        return True
+
+async def sweep_processed_requests_periodically() -> None:
+    """Background task that sweeps stale processing keys."""
+    while True:
+        await asyncio.sleep(PROCESSING_SWEEP_INTERVAL_SECONDS)
+        removed = sweep_processed_requests()
+        if removed:
+            logger.warning(f"🧹 Removed {removed} stale processing keys")
 
-def send_log_callback(
+# Cabeçalhos fixos das requisições de saída (copiados e completados a cada chamada)
+_CALLBACK_HEADERS_TEMPLATE = {"Content-Type": "application/json", "user-agent": "integracao.mobilemed"}
+_LOG_HEADERS_TEMPLATE = {'Content-Type': 'application/json'}
+
+async def send_log_callback(
     exameID: int,
     success: bool,
     message: str,
@@ -154,7 +439,7 @@ def send_log_callback(
         bool: True if log was sent successfully, False otherwise
     """
     try:
-        create_log_url = os.getenv('CREATE_LOG_URL')
+        create_log_url = app.state.create_log_url
         
         if not create_log_url:
             logger.warning("CREATE_LOG_URL not configured")
@@ -171,47 +456,154 @@ def send_log_callback(
         if additional_data:
             payload.update(additional_data)
         
-        response = requests.post(
+        response = await app.state.log_client.post(
             create_log_url,
-            json=payload,
-            timeout=10,
-            headers={'Content-Type': 'application/json', 'token': integrationToken}
+            content=_json_dumps(payload),
+            headers={**_LOG_HEADERS_TEMPLATE, 'token': integrationToken}
         )
         
         response.raise_for_status()
         logger.info(f"Log callback sent successfully: {exameID} - success: {success}")
         return True
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Failed to send log callback: {str(e)}")
         return False
     except Exception as e:
         logger.error(f"Unexpected error sending log callback: {str(e)}")
         return False
 
-def validate_client_ip(request: Request) -> bool:
-    """Validate client IP against allowed IPs from environment variable."""
-    allowed_ips_env = os.getenv('ALLOWED_CLIENT_IPS', '')
+def render_study_pdf(
+    study_iuid: str,
+    max_workers: int,
+    cover_page: bool,
+    anonymize: bool,
+    cover_page_summary: bool = True) -> Optional[bytes]:
+    """
+    Download a study and render it to PDF bytes (runs inside the process pool).
     
-    if not allowed_ips_env:
-        logger.warning("⚠️ ALLOWED_CLIENT_IPS not configured - allowing all IPs")
-        return True
+    Returns None when no valid DICOM instances were found. Raw bytes are returned
+    instead of a BytesIO so the result pickles back to the event loop cheaply.
+    """
+    studies = process_dicom_wado_study(study_iuid, max_workers=max_workers)
+    if not studies:
+        return None
+    
+    pdf_buffer = create_pdf_from_studies(
+        studies, cover_page=cover_page, anonymize=anonymize, cover_page_summary=cover_page_summary
+    )
+    return pdf_buffer.getvalue()
+
+def create_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for render_study_pdf (spawn: the main process already runs threads)."""
+    return ProcessPoolExecutor(
+        max_workers=int(os.getenv('PDF_PROCESS_WORKERS', str(os.cpu_count() or 1))),
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+async def _replace_broken_pdf_pool(broken_pool: ProcessPoolExecutor) -> None:
+    """Swap a broken pdf_pool for a fresh one (once, even if several requests hit it)."""
+    async with app.state.pdf_pool_lock:
+        if app.state.pdf_pool is broken_pool:
+            logger.warning("⚠️ PDF process pool is broken (worker died), creating a new one")
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+            app.state.pdf_pool = create_pdf_pool()
+
+async def run_render_study_pdf(study_iuid: str, max_workers: int, cover_page: bool, anonymize: bool,
+                               cover_page_summary: bool = True) -> bytes:
+    """
+    Run render_study_pdf in the process pool, raising HTTP 400 for empty studies.
+    
+    A worker that dies breaks the whole pool: it is replaced for later requests
+    and this request fails with HTTP 503. No automatic retry, so a study that
+    crashes its worker (poison input, OOM) cannot break the fresh pool too.
+    """
+    loop = asyncio.get_running_loop()
+    pool = app.state.pdf_pool
+    try:
+        pdf_bytes = await loop.run_in_executor(
+            pool, render_study_pdf,
+            study_iuid, max_workers, cover_page, anonymize, cover_page_summary
+        )
+    except BrokenProcessPool:
+        await _replace_broken_pdf_pool(pool)
+        raise HTTPException(
+            status_code=503,
+            detail="PDF worker process terminated unexpectedly"
+        )
+    if pdf_bytes is None:
+        raise HTTPException(
+            status_code=400, 
+            detail="No valid DICOM instances found in DICOMweb server"
+        )
+    return pdf_bytes
+
+async def iter_pdf_chunks(pdf_bytes: bytes, chunk_size: int = 64 * 1024):
+    """Yield the PDF in fixed-size chunks so the response starts flushing immediately."""
+    # bytes, not memoryview: older Starlette (0.36.x, fastapi 0.110) calls .encode() on any non-bytes chunk
+    for offset in range(0, len(pdf_bytes), chunk_size):
+        yield pdf_bytes[offset:offset + chunk_size]
+
+# Strong references to in-flight log tasks (the event loop only keeps weak ones)
+_log_tasks = set()
+
+def _fire_and_forget_log(**kwargs) -> None:
+    """Schedule send_log_callback in the background without waiting for the external API."""
+    task = asyncio.create_task(send_log_callback(**kwargs))
+    _log_tasks.add(task)
+    task.add_done_callback(_log_tasks.discard)
+
+def build_ip_allowlist(entries: Iterable[str]) -> Dict[Tuple[int, int], FrozenSet[int]]:
+    """
+    Index allowlist entries (single IPs or CIDR ranges) by (IP version, prefix length).
+    
+    Each network is stored as its address shifted down to the prefix bits, so a
+    lookup is one set membership test per distinct prefix length in the list.
+    """
+    networks: Dict[Tuple[int, int], set] = {}
+    for entry in entries:
+        try:
+            network = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            continue  # Não é IP/CIDR (ex.: hostname) - só casa por igualdade exata
+        shift = network.max_prefixlen - network.prefixlen
+        networks.setdefault((network.version, network.prefixlen), set()).add(
+            int(network.network_address) >> shift
+        )
+    return {key: frozenset(prefixes) for key, prefixes in networks.items()}
+
+def ip_in_allowlist(client_ip: str, networks: Dict[Tuple[int, int], FrozenSet[int]]) -> bool:
+    """Check whether client_ip falls inside any network built by build_ip_allowlist."""
+    try:
+        address = ipaddress.ip_address(client_ip)
+    except ValueError:
+        return False
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
     
-    # Parse comma-separated list of allowed IPs
-    allowed_ips = [ip.strip() for ip in allowed_ips_env.split(',') if ip.strip()]
+    value = int(address)
+    for (version, prefixlen), prefixes in networks.items():
+        if version == address.version and value >> (address.max_prefixlen - prefixlen) in prefixes:
+            return True
+    return False
+
+def validate_client_ip(request: Request) -> bool:
+    """Validate client IP against the allowed IPs parsed at startup."""
+    allowed_ips = request.app.state.allowed_ips
     
+    # Empty allowlist: all IPs allowed (already reported once at startup)
     if not allowed_ips:
-        logger.warning("⚠️ ALLOWED_CLIENT_IPS is empty - allowing all IPs")
         return True
     
-    # Get client IP (handles proxy headers)
-    client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
+    # Get client IP (handles proxy headers); partition avoids building a list
+    forwarded_for = request.headers.get("x-forwarded-for")
+    client_ip = forwarded_for.partition(",")[0].strip() if forwarded_for else ""
     if not client_ip:
-        client_ip = request.headers.get("X-Real-IP", "")
+        client_ip = request.headers.get("x-real-ip", "")
     if not client_ip:
         client_ip = request.client.host if request.client else "unknown"
     
-    is_allowed = client_ip in allowed_ips
+    is_allowed = client_ip in allowed_ips or ip_in_allowlist(client_ip, request.app.state.allowed_networks)
     
     if not is_allowed:
         logger.warning(f"🚫 Blocked request from IP {client_ip} (allowed: {', '.join(allowed_ips)})")
@@ -238,43 +630,48 @@ async def send_callback(callback_url: str, payload: CallbackPayloadSantana):
                          "CodProcedimento": payload.CodProcedimento
                         }
             
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                callback_url,
-                json=payload_dict,
-                headers={
-                 "Content-Type": "application/json",
-                 "Authorization": payload.Authorization,
-                 "user-agent": "integracao.mobilemed"
-                }
+        # Corpo serializado uma única vez (o PDF em Base64 domina o tamanho)
+        body = _json_dumps(payload_dict)
+        headers = {**_CALLBACK_HEADERS_TEMPLATE, "Authorization": payload.Authorization}
+        
+        # Opcional: o receptor precisa aceitar corpo de requisição com Content-Encoding gzip
+        if app.state.callback_gzip:
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(None, functools.partial(gzip.compress, body, compresslevel=1))
+            headers["Content-Encoding"] = "gzip"
+        
+        response = await app.state.callback_client.post(
+            callback_url,
+            content=body,
+            headers=headers
+        )
+        
+        if response.status_code == 200:
+            logger.info(f"✅ Callback successful")
+            _fire_and_forget_log(
+                exameID=payload.examID,
+                success=True,
+                message=response.text or "Sucesso no envio de PDF",
+                statusCode=200,
+                statusMessage="OK",
+                integrationToken=payload.IntegrationToken,
+            )
+            return True
+        else:
+            logger.warning(f"⚠️ Callback failed with status {response.status_code}")
+            _fire_and_forget_log(
+                exameID=payload.examID,
+                success=False,
+                message=f"Callback failed with status {response.status_code}: {response.text}",
+                statusCode=response.status_code,
+                statusMessage=response.reason_phrase,
+                integrationToken=payload.IntegrationToken,
             )
+            return False
             
-            if response.status_code == 200:
-                logger.info(f"✅ Callback successful")
-                send_log_callback(
-                    exameID=payload.examID,
-                    success=True,
-                    message=response.text or "Sucesso no envio de PDF",
-                    statusCode=200,
-                    statusMessage="OK",
-                    integrationToken=payload.IntegrationToken,
-                )
-                return True
-            else:
-                logger.warning(f"⚠️ Callback failed with status {response.status_code}")
-                send_log_callback(
-                    exameID=payload.examID,
-                    success=False,
-                    message=f"Callback failed with status {response.status_code}: {response.text}",
-                    statusCode=response.status_code,
-                    statusMessage=response.reason_phrase,
-                    integrationToken=payload.IntegrationToken,
-                )
-                return False
-                
     except Exception as e:
         logger.error(f"❌ Callback failed: {str(e)}")
-        send_log_callback(
+        _fire_and_forget_log(
             exameID=payload.examID,
             success=False,
             message=f"Callback exception: {str(e)}",
@@ -294,30 +691,21 @@ async def process_dicom_async(render_request: RenderRequest, callback_url: str):
         logger.info(f"🚀 Starting async DICOM processing for examID: {render_request.examID}")
         start_time = time.time()
         
-        # Process DICOM files via DICOMweb WADO usando pacs_studies_iuid
-        studies = process_dicom_wado_study(
+        # Process DICOM files via DICOMweb WADO usando pacs_studies_iuid and generate PDF (process pool)
+        pdf_bytes = await run_render_study_pdf(
             render_request.pacs_studies_iuid,  # Usar pacs_studies_iuid
-            max_workers=render_request.max_workers
+            render_request.max_workers,
+            render_request.cover_page,
+            render_request.anonymize,
+            render_request.cover_page_summary
         )
         
-        if not studies:
-            raise HTTPException(
-                status_code=400, 
-                detail="No valid DICOM instances found in DICOMweb server"
-            )
-        
-        # Generate PDF
-        pdf_buffer = create_pdf_from_studies(
-            studies, 
-            cover_page=render_request.cover_page, 
-            anonymize=render_request.anonymize
-        )
-        
-        # Convert to Base64
-        pdf_base64 = base64.b64encode(pdf_buffer.getvalue()).decode('utf-8')
+        # Convert to Base64 off the event loop (output is pure ASCII, cheaper to decode than UTF-8)
+        loop = asyncio.get_running_loop()
+        pdf_base64 = (await loop.run_in_executor(None, base64.b64encode, pdf_bytes)).decode('ascii')
         
         total_time = time.time() - start_time
-        pdf_size = len(pdf_buffer.getvalue())
+        pdf_size = len(pdf_bytes)
         
         logger.info(f"⏱️ Processing completed in {total_time:.2f}s")
         logger.info(f"📄 PDF size: {pdf_size:,} bytes, Base64 size: {len(pdf_base64):,} chars")
@@ -337,7 +725,7 @@ async def process_dicom_async(render_request: RenderRequest, callback_url: str):
         await send_callback(callback_url, callback_payload)
         
         # Send success log
-        send_log_callback(
+        _fire_and_forget_log(
             exameID=render_request.examID,
             success=True,
             message="PDF de imagens DICOM gerado com sucesso (async), tempo de processamento: " f"{total_time:.2f}s",
@@ -356,7 +744,7 @@ async def process_dicom_async(render_request: RenderRequest, callback_url: str):
         
         # Error callback
         # Send error log to external API
-        send_log_callback(
+        _fire_and_forget_log(
             exameID=render_request.examID,
             success=False,
             message=f"Error processing DICOM to PDF: {str(e)}",
@@ -372,8 +760,7 @@ async def process_dicom_async(render_request: RenderRequest, callback_url: str):
         
     finally:
         # Remove from processing set
-        if process_key in processed_requests:
-            processed_requests.remove(process_key)
+        processed_requests.pop(process_key, None)
 
 @app.get("/pdf-generator/health")
 async def health_check(request: Request) -> Dict[str, Union[str, int]]:
@@ -381,11 +768,8 @@ async def health_check(request: Request) -> Dict[str, Union[str, int]]:
     # Validate client IP
     check_ip_access(request)
     
-    dicom_wado_url = os.getenv('DICOM_WADO_URL')
-    allowed_ips_env = os.getenv('ALLOWED_CLIENT_IPS', '')
-    
-    # Parse allowed IPs for response
-    allowed_ips = [ip.strip() for ip in allowed_ips_env.split(',') if ip.strip()] if allowed_ips_env else []
+    dicom_wado_url = request.app.state.dicom_wado_url
+    allowed_ips = request.app.state.allowed_ips
     
     return {
         "status": "ok",
@@ -413,17 +797,14 @@ async def render_dicom_to_pdf_async(
     # Generate unique processing key usando os novos campos
     process_key = f"{render_request.examID}-{render_request.pacs_studies_iuid}"
     
-    # Check if already processing (idempotency)
-    if process_key in processed_requests:
+    # Check if already processing (idempotency) and add to processing set atomically
+    if not await claim_process_key(process_key):
         logger.warning(f"⚠️ Request already being processed: {process_key}")
         raise HTTPException(
             status_code=409, 
             detail=f"Request for examID {render_request.examID} is already being processed"
         )
     
-    # Add to processing set
-    processed_requests.add(process_key)
-    
     try:
         # Get callback URL
         callback_url = render_request.UrlCallback
@@ -447,12 +828,15 @@ async def render_dicom_to_pdf_async(
         
     except Exception as e:
         # Remove from processing set on immediate error
-        if process_key in processed_requests:
-            processed_requests.remove(process_key)
+        processed_requests.pop(process_key, None)
         raise
 
 @app.post("/pdf-generator/render/sync")
-async def render_dicom_to_pdf_sync(render_request: RenderRequestSync, request: Request):
+async def render_dicom_to_pdf_sync(
+    background_tasks: BackgroundTasks,
+    render_request: RenderRequestSync,
+    request: Request,
+):
     """
     Convert DICOM files to PDF via DICOMweb WADO (Synchronous - Legacy).
     Returns PDF directly without callback.
@@ -465,37 +849,24 @@ async def render_dicom_to_pdf_sync(render_request: RenderRequestSync, request: R
     start_time = time.time()
     
     try:
-        # Process DICOM files via DICOMweb WADO
-        studies = process_dicom_wado_study(
+        # Process DICOM files via DICOMweb WADO and generate PDF (process pool)
+        pdf_bytes = await run_render_study_pdf(
             render_request.pacs_studies_iuid,  # Usar pacs_studies_iuid
-            max_workers=render_request.max_workers or 4
-        )
-        
-        if not studies:
-            raise HTTPException(
-                status_code=400, 
-                detail="No valid DICOM instances found in DICOMweb server"
-            )
-        
-        # Generate PDF
-        pdf_start = time.time()
-        pdf_buffer = create_pdf_from_studies(
-            studies, 
-            cover_page=render_request.cover_page or False, 
-            anonymize=render_request.anonymize or False
+            render_request.max_workers or 4,
+            render_request.cover_page or False,
+            render_request.anonymize or False,
+            render_request.cover_page_summary is not False
         )
         
         total_time = time.time() - start_time
-        pdf_size = len(pdf_buffer.getvalue())
+        pdf_size = len(pdf_bytes)
         
         logger.info(f"⏱️ Sync processing completed in {total_time:.2f}s")
         logger.info(f"📄 PDF size: {pdf_size:,} bytes")
         
-        # Reset buffer position for streaming
-        pdf_buffer.seek(0)
-        
-        # Send success log
-        send_log_callback(
+        # Send success log (after the response is sent)
+        background_tasks.add_task(
+            send_log_callback,
             exameID=render_request.examID,
             success=True,
             message="PDF de imagens DICOM gerado com sucesso (sync), tempo de processamento: " f"{total_time:.2f}s",
@@ -510,14 +881,17 @@ async def render_dicom_to_pdf_sync(render_request: RenderRequestSync, request: R
         )
         
         return StreamingResponse(
-            iter([pdf_buffer.getvalue()]),
+            iter_pdf_chunks(pdf_bytes),
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=exam_{render_request.examID}.pdf"}
+            headers={
+                "Content-Disposition": f"attachment; filename=exam_{render_request.examID}.pdf",
+                "Content-Length": str(pdf_size)
+            }
         )
         
     except Exception as e:
         # Send error log to external API
-        send_log_callback(
+        _fire_and_forget_log(
             exameID=render_request.examID,
             success=False,
             message=f"Error processing DICOM to PDF: {str(e)}",
@@ -532,4 +906,18 @@ async def render_dicom_to_pdf_sync(render_request: RenderRequestSync, request: R
         
         total_time = time.time() - start_time
         logger.error(f"❌ Error processing sync request for examID {render_request.examID} after {total_time:.2f}s: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+if __name__ == "__main__":
+    import importlib.util
+    import uvicorn
+    
+    # uvloop/httptools explicitamente (instalados com uvicorn[standard], exceto uvloop no Windows)
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv('API_HOST', '0.0.0.0'),
+        port=int(os.getenv('API_PORT', '9000')),
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        workers=int(os.getenv('WEB_CONCURRENCY', '4'))
+    )
\ No newline at end of file
@@ -10,9 +10,34 @@ from pydicom import Dataset
 logger = logging.getLogger(__name__)
 
 
+def _instance_sort_key(ds: Dataset) -> Tuple[float, int, str]:
+    """Sort key for a series instance, reading each tag once (EAFP instead of hasattr)."""
+    # Primary: ImagePositionPatient[2] (Z-coordinate)
+    try:
+        z_pos = float(ds.ImagePositionPatient[2])
+    except (AttributeError, IndexError, ValueError, TypeError):
+        z_pos = 0.0
+    
+    # Secondary: InstanceNumber
+    try:
+        instance_num = int(ds.InstanceNumber)
+    except (AttributeError, ValueError, TypeError):
+        instance_num = 0
+    
+    # Tertiary: filename or object ID (datasets read from memory carry the BytesIO
+    # or None here, which can't be compared)
+    filename = getattr(ds, 'filename', None)
+    if not isinstance(filename, str):
+        filename = str(id(ds))
+    
+    return (z_pos, instance_num, filename)
+
+
 class DicomSeries:
     """Represents a DICOM series with metadata and images."""
     
+    __slots__ = ('series_uid', 'series_description', 'instances', 'modality')
+    
     def __init__(self, series_uid: str, series_description: str = ""):
         self.series_uid = series_uid
         self.series_description = series_description
@@ -27,34 +52,17 @@ class DicomSeries:
     
     def sort_instances(self) -> None:
         """Sort instances by ImagePositionPatient[2], InstanceNumber, or filename."""
-        def sort_key(ds: Dataset) -> Tuple[float, int, str]:
-            # Primary: ImagePositionPatient[2] (Z-coordinate)
-            z_pos = 0.0
-            if hasattr(ds, 'ImagePositionPatient') and ds.ImagePositionPatient:
-                try:
-                    z_pos = float(ds.ImagePositionPatient[2])
-                except (IndexError, ValueError, TypeError):
-                    pass
-            
-            # Secondary: InstanceNumber
-            instance_num = 0
-            if hasattr(ds, 'InstanceNumber'):
-                try:
-                    instance_num = int(ds.InstanceNumber)
-                except (ValueError, TypeError):
-                    pass
-            
-            # Tertiary: filename or object ID
-            filename = getattr(ds, 'filename', str(id(ds)))
-            
-            return (z_pos, instance_num, filename)
-        
-        self.instances.sort(key=sort_key)
+        # list.sort computes each key once per instance (not per comparison)
+        self.instances.sort(key=_instance_sort_key)
 
 
 class DicomStudy:
     """Represents a DICOM study containing multiple series."""
     
+    __slots__ = ('study_uid', 'series', 'patient_name', 'patient_id',
+                 'study_date', 'accession_number', 'study_description',
+                 '_meta_populated')
+    
     def __init__(self, study_uid: str):
         self.study_uid = study_uid
         self.series: Dict[str, DicomSeries] = {}
@@ -63,6 +71,7 @@ class DicomStudy:
         self.study_date = ""
         self.accession_number = ""
         self.study_description = ""
+        self._meta_populated = False
     
     def add_instance(self, dataset: Dataset) -> None:
         """Add a DICOM instance to the appropriate series."""
@@ -74,7 +83,12 @@ class DicomStudy:
         
         self.series[series_uid].add_instance(dataset)
         
-        # Update study-level metadata from first instance
+        # Update study-level metadata until every field is filled (same for the whole study)
+        if not self._meta_populated:
+            self._populate_metadata(dataset)
+    
+    def _populate_metadata(self, dataset: Dataset) -> None:
+        """Fill the study-level fields (patient, date, accession, description) still empty."""
         if not self.patient_name and hasattr(dataset, 'PatientName'):
             self.patient_name = str(dataset.PatientName)
         if not self.patient_id and hasattr(dataset, 'PatientID'):
@@ -85,6 +99,9 @@ class DicomStudy:
             self.accession_number = str(dataset.AccessionNumber)
         if not self.study_description and hasattr(dataset, 'StudyDescription'):
             self.study_description = str(dataset.StudyDescription)
+        # Fields missing here are still taken from later instances
+        self._meta_populated = bool(self.patient_name and self.patient_id and self.study_date
+                                    and self.accession_number and self.study_description)
     
     def finalize(self) -> None:
         """Sort all series instances."""
@@ -3,10 +3,16 @@ PDF generation utilities for creating PDF documents from DICOM studies.
 Handles cover page generation, image layout, and document structure.
 """
 
+import itertools
 import logging
+import multiprocessing
+import multiprocessing.util
+import os
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-from typing import Dict, List, Any, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 
 from reportlab.lib.pagesizes import A4
@@ -14,13 +20,126 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.utils import ImageReader
+from reportlab import rl_config
+import numpy as np
 from PIL import Image
+from pydicom import Dataset
 
 from .models import DicomStudy, DicomSeries
-from .image_utils import dicom_to_pil, get_frame_count
+from .image_utils import (dicom_to_pil_frames, encapsulated_jpeg_frames, flatten_alpha,
+                          frame_count_from_metadata)
+
+# Optional direct libjpeg-turbo encoder (needs the system libturbojpeg)
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY, TJPF_RGB, TJSAMP_420, TJSAMP_GRAY
+    _TURBOJPEG = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _TURBOJPEG = None
 
 logger = logging.getLogger(__name__)
 
+# JPEG quality of the images embedded in the PDF
+JPEG_QUALITY = 90
+
+# Write binary streams: ASCII85 makes a text copy of every image stream that is
+# 25% larger than the JPEG itself, costing memory, output size and CPU
+rl_config.useA85 = 0
+
+# Maximum resolution of images embedded in the PDF (pixels per inch of page)
+RENDER_DPI = 200
+
+# Area available for an image (A4 with margins, extra space for headers/footers)
+PAGE_MARGIN = 0.75 * inch
+AVAILABLE_WIDTH = A4[0] - 2 * PAGE_MARGIN
+AVAILABLE_HEIGHT = A4[1] - 2 * PAGE_MARGIN - 1 * inch
+
+# Paragraph styles, built once (Paragraph only reads them, so they are shared by every page)
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
+_INFO_STYLE = ParagraphStyle(
+    'CustomInfo',
+    parent=_STYLES['Normal'],
+    fontSize=12,
+    spaceAfter=12,
+    alignment=TA_LEFT
+)
+_IMAGE_INFO_STYLE = ParagraphStyle(
+    'ImageInfo',
+    parent=_STYLES['Normal'],
+    fontSize=8,
+    spaceAfter=6,
+    alignment=TA_CENTER
+)
+_ERROR_STYLE = ParagraphStyle(
+    'Error',
+    parent=_STYLES['Normal'],
+    fontSize=12,
+    alignment=TA_CENTER
+)
+_NO_IMAGES_STYLE = ParagraphStyle(
+    'NoImages',
+    parent=_STYLES['Heading1'],
+    fontSize=18,
+    alignment=TA_CENTER
+)
+
+# Spacers and page breaks hold no per-page state, so one instance serves every page
+_TOP_SPACER = Spacer(1, 0.2 * inch)
+_INFO_SPACER = Spacer(1, 0.1 * inch)
+_ERROR_SPACER = Spacer(1, 2 * inch)
+_PAGE_BREAK = PageBreak()
+
+# Cover page series summary line: modality, description, instances, images
+_SERIES_TMPL = "• <b>%s</b> - %s (%d instances, %d images)"
+
+# (jpeg_bytes, width, height, metadata) for one frame; jpeg_bytes is None if it failed
+RenderedFrame = Tuple[Optional[bytes], float, float, Dict[str, Any]]
+
+# Render worker processes, created on first use and reused across studies
+_RENDER_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def get_render_workers() -> int:
+    """
+    Number of processes used to render pages (PDF_RENDER_WORKERS, 1 = in-process).
+    
+    Defaults to the cores left per PDF process, so PDF_PROCESS_WORKERS x
+    PDF_RENDER_WORKERS does not oversubscribe the machine.
+    """
+    cpu_count = os.cpu_count() or 1
+    pdf_processes = max(1, int(os.getenv('PDF_PROCESS_WORKERS', str(cpu_count))))
+    return max(1, int(os.getenv('PDF_RENDER_WORKERS', str(cpu_count // pdf_processes))))
+
+
+def _get_render_pool(workers: int) -> ProcessPoolExecutor:
+    """Create the render process pool on first use (spawn: safe with threads in the parent)."""
+    global _RENDER_POOL
+    if _RENDER_POOL is None:
+        _RENDER_POOL = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        # Quando rodamos dentro de um worker do pool de PDFs, o processo sai sem os hooks
+        # de atexit do concurrent.futures: encerra o pool antes de aguardar os filhos
+        # (prioridade acima do finalizer que fecha as filas do próprio pool)
+        multiprocessing.util.Finalize(None, _discard_render_pool, kwargs={'wait': True}, exitpriority=100)
+    return _RENDER_POOL
+
+
+def _discard_render_pool(wait: bool = False) -> None:
+    """Drop the render pool (broken or at exit); the next call creates a fresh one."""
+    global _RENDER_POOL
+    if _RENDER_POOL is not None:
+        _RENDER_POOL.shutdown(wait=wait, cancel_futures=True)
+        _RENDER_POOL = None
+
 
 class NumberedCanvas:
     """Custom canvas for adding headers and footers."""
@@ -61,27 +180,19 @@ class NumberedCanvas:
                                      self.page_info['window_info'])
 
 
-def create_cover_page(study: DicomStudy, anonymize: bool = False) -> List[Any]:
-    """Create a cover page with study metadata."""
-    styles = getSampleStyleSheet()
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
+def create_cover_page(study: DicomStudy, anonymize: bool = False,
+                      frame_counts: Optional[Dict[int, int]] = None,
+                      generation_ts: Optional[str] = None, summary: bool = True) -> List[Any]:
+    """
+    Create a cover page with study metadata.
     
-    # Info style
-    info_style = ParagraphStyle(
-        'CustomInfo',
-        parent=styles['Normal'],
-        fontSize=12,
-        spaceAfter=12,
-        alignment=TA_LEFT
-    )
+    frame_counts (id(instance) -> frames) and generation_ts are computed by the
+    caller once per document when available. summary=False leaves out the
+    per-series summary (and the frame counting it needs).
+    """
+    frame_counts = frame_counts or {}
+    title_style = _TITLE_STYLE
+    info_style = _INFO_STYLE
     
     elements = []
     
@@ -103,12 +214,8 @@ def create_cover_page(study: DicomStudy, anonymize: bool = False) -> List[Any]:
     
     # Study information (always shown)
     study_date = study.study_date or "Unknown"
-    if len(study_date) == 8:  # YYYYMMDD format
-        try:
-            formatted_date = datetime.strptime(study_date, "%Y%m%d").strftime("%Y-%m-%d")
-            study_date = formatted_date
-        except ValueError:
-            pass
+    if len(study_date) == 8 and study_date.isdigit():  # YYYYMMDD format
+        study_date = f"{study_date[:4]}-{study_date[4:6]}-{study_date[6:8]}"
     
     elements.append(Paragraph(f"<b>Study Date:</b> {study_date}", info_style))
     elements.append(Paragraph(f"<b>Accession Number:</b> {study.accession_number or 'Unknown'}", info_style))
@@ -116,110 +223,274 @@ def create_cover_page(study: DicomStudy, anonymize: bool = False) -> List[Any]:
     
     elements.append(Spacer(1, 0.3 * inch))
     
-    # Series summary
-    elements.append(Paragraph("<b>Series Summary:</b>", info_style))
-    elements.append(Spacer(1, 0.1 * inch))
-    
-    for series in study.series.values():
-        modality = series.modality or "Unknown"
-        description = series.series_description or "No description"
-        instance_count = len(series.instances)
-        
-        # Count total frames
-        total_frames = 0
-        for instance in series.instances:
-            total_frames += get_frame_count(instance)
+    # Series summary (optional: one line per series)
+    if summary:
+        elements.append(Paragraph("<b>Series Summary:</b>", info_style))
+        elements.append(Spacer(1, 0.1 * inch))
         
-        series_info = (f"• <b>{modality}</b> - {description} "
-                      f"({instance_count} instances, {total_frames} images)")
-        elements.append(Paragraph(series_info, info_style))
+        for series in study.series.values():
+            modality = series.modality or "Unknown"
+            description = series.series_description or "No description"
+            instance_count = len(series.instances)
+            
+            # Count total frames
+            total_frames = sum(frame_counts.get(id(instance)) or frame_count_from_metadata(instance)
+                               for instance in series.instances)
+            
+            elements.append(Paragraph(_SERIES_TMPL % (modality, description, instance_count, total_frames), info_style))
     
     elements.append(Spacer(1, 0.5 * inch))
     
     # Generation timestamp
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    elements.append(Paragraph(f"<i>Generated on: {timestamp}</i>", info_style))
+    if generation_ts is None:
+        generation_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    elements.append(Paragraph(f"<i>Generated on: {generation_ts}</i>", info_style))
     
     # Page break after cover
-    elements.append(PageBreak())
+    elements.append(_PAGE_BREAK)
     
     return elements
 
 
+class JPEGImageReader(ImageReader):
+    """
+    ImageReader for JPEG data, which the PDF embeds as-is (DCTDecode).
+    
+    Canvas.drawImage only calls getRGBData() to name the image XObject, and the
+    stock reader decodes the whole JPEG for that. The compressed bytes identify
+    the image just as well (identical JPEGs still share one XObject), so nothing
+    is ever decoded.
+    
+    Relies on ImageReader internals (_data, _dataA, _image, fp), hence the
+    reportlab minor version pin in requirements.txt; tests/test_pdf_utils.py
+    checks the JPEG still reaches the PDF as DCTDecode.
+    """
+    
+    def __init__(self, jpeg_bytes: bytes):
+        super().__init__(BytesIO(jpeg_bytes))
+        self._jpeg_bytes = jpeg_bytes
+    
+    def getRGBData(self):
+        if self._data is None:
+            self._dataA = None
+            self.mode = self._image.mode
+            self._data = self._jpeg_bytes  # no getvalue() copy
+        return self._data
+    
+    def close(self) -> None:
+        """Release the JPEG data and its buffer."""
+        self._image.close()
+        self.fp.close()
+        self._data = self._jpeg_bytes = None
+
+
+class JPEGImage(RLImage):
+    """
+    Image flowable for JPEG bytes, drawn through JPEGImageReader.
+    
+    The JPEG is released as soon as the page is drawn (the PDF keeps its own
+    copy of the stream), so buffers don't pile up until the build ends.
+    """
+    
+    def __init__(self, jpeg_bytes: bytes, width: float, height: float):
+        self._img = JPEGImageReader(jpeg_bytes)
+        super().__init__(self._img.fp, width=width, height=height)
+    
+    def draw(self):
+        super().draw()
+        self._img.close()
+        self._img = self._file = None
+
+
 def pil_to_reportlab_image(pil_image: Image.Image, max_width: float, max_height: float) -> RLImage:
     """Convert PIL image to ReportLab image with proper scaling."""
-    # Save PIL image to BytesIO
-    img_buffer = BytesIO()
+    jpeg_bytes, width, height = pil_to_jpeg(pil_image, max_width, max_height)
+    return JPEGImage(jpeg_bytes, width, height)
+
+
+def pil_to_jpeg(pil_image: Image.Image, max_width: float, max_height: float) -> Tuple[bytes, float, float]:
+    """Encode PIL image to JPEG bytes and compute its size scaled to fit max_width x max_height."""
+    # Never encode more pixels than the page shows at RENDER_DPI (no-op for frames
+    # from dicom_to_pil, which are already decoded to this size)
+    target_size = (int(max_width / inch * RENDER_DPI), int(max_height / inch * RENDER_DPI))
+    if pil_image.width > target_size[0] or pil_image.height > target_size[1]:
+        pil_image = pil_image.copy()
+        pil_image.thumbnail(target_size, Image.Resampling.LANCZOS)
     
     # Convert to RGB if necessary
     if pil_image.mode in ('RGBA', 'LA'):
-        background = Image.new('RGB', pil_image.size, (255, 255, 255))
-        if pil_image.mode == 'RGBA':
-            background.paste(pil_image, mask=pil_image.split()[-1])
-        else:
-            background.paste(pil_image, mask=pil_image.split()[-1])
-        pil_image = background
+        pil_image = flatten_alpha(pil_image)
     elif pil_image.mode not in ('RGB', 'L'):
         pil_image = pil_image.convert('RGB')
     
-    pil_image.save(img_buffer, format='JPEG', quality=90)
-    img_buffer.seek(0)
+    if _TURBOJPEG is not None:
+        # Same 4:2:0 subsampling Pillow uses by default at this quality
+        if pil_image.mode == 'L':
+            pixel_format, subsample = TJPF_GRAY, TJSAMP_GRAY
+        else:
+            pixel_format, subsample = TJPF_RGB, TJSAMP_420
+        jpeg_bytes = _TURBOJPEG.encode(
+            np.asarray(pil_image), quality=JPEG_QUALITY,
+            pixel_format=pixel_format, jpeg_subsample=subsample
+        )
+    else:
+        # Save PIL image to BytesIO
+        img_buffer = BytesIO()
+        pil_image.save(img_buffer, format='JPEG', quality=JPEG_QUALITY)
+        jpeg_bytes = img_buffer.getvalue()
     
-    # Calculate scaled dimensions maintaining aspect ratio
-    img_width, img_height = pil_image.size
+    width, height = fit_to_box(pil_image.size[0], pil_image.size[1], max_width, max_height)
+    return jpeg_bytes, width, height
+
+
+def fit_to_box(img_width: int, img_height: int, max_width: float, max_height: float) -> Tuple[float, float]:
+    """Calculate scaled dimensions maintaining aspect ratio."""
     aspect_ratio = img_width / img_height
     
     if aspect_ratio > max_width / max_height:
         # Image is wider - limit by width
-        width = max_width
-        height = max_width / aspect_ratio
-    else:
-        # Image is taller - limit by height
-        height = max_height
-        width = max_height * aspect_ratio
+        return max_width, max_width / aspect_ratio
+    # Image is taller - limit by height
+    return max_height * aspect_ratio, max_height
+
+
+def render_instance_frames(instance: Dataset, max_width: float, max_height: float,
+                           frame_count: Optional[int] = None) -> List[RenderedFrame]:
+    """
+    Decode, window and JPEG-encode every frame of a DICOM instance.
     
-    # Create ReportLab image
-    rl_image = RLImage(img_buffer, width=width, height=height)
+    Top-level (pickleable) so it can run in the render process pool; only the
+    JPEG bytes and layout sizes travel back to the parent. frame_count, when
+    already known, skips counting the frames again.
+    """
+    # Convert DICOM to PIL, no larger than what the page can show at RENDER_DPI
+    target_size = (int(max_width / inch * RENDER_DPI), int(max_height / inch * RENDER_DPI))
+    
+    rendered: List[RenderedFrame] = []
+    
+    # JPEG Baseline colour frames are embedded as stored, without decode + re-encode
+    jpeg_frames = encapsulated_jpeg_frames(instance, target_size)
+    if jpeg_frames is not None:
+        try:
+            width, height = fit_to_box(int(instance.Columns), int(instance.Rows), max_width, max_height)
+            photometric = instance.get('PhotometricInterpretation')
+            for frame_index, jpeg_bytes in enumerate(jpeg_frames):
+                metadata = {'window_center': None, 'window_width': None,
+                            'photometric': photometric, 'frame_index': frame_index}
+                rendered.append((jpeg_bytes, width, height, metadata))
+            return rendered
+        except Exception as e:
+            logger.debug("JPEG pass-through failed, decoding instead: %s", e)
+            rendered.clear()
+    
+    try:
+        for pil_image, metadata in dicom_to_pil_frames(instance, target_size, frame_count):
+            try:
+                jpeg_bytes, width, height = pil_to_jpeg(pil_image, max_width, max_height)
+                rendered.append((jpeg_bytes, width, height, metadata))
+            except Exception as e:
+                logger.error("Error encoding image: %s", e)
+                rendered.append((None, 0.0, 0.0, {'error': str(e)}))
+    except Exception as e:
+        logger.error("Error rendering instance: %s", e)
+        rendered.append((None, 0.0, 0.0, {'error': str(e)}))
     
-    return rl_image
+    return rendered
+
+
+def render_instances(instances: List[Dataset], frame_counts: List[Optional[int]],
+                     max_width: float, max_height: float) -> Iterator[List[RenderedFrame]]:
+    """
+    Render instances in order, rendering each SOPInstanceUID only once.
+    
+    The same instance can be referenced more than once (e.g. repeated localizers);
+    repeats reuse the frames of the first occurrence, which are kept only until
+    the last repeat has been yielded.
+    """
+    keys = [instance.get('SOPInstanceUID') for instance in instances]
+    remaining = Counter(key for key in keys if key is not None)
+    
+    unique_instances = []
+    unique_frame_counts = []
+    seen = set()
+    for instance, frame_count, key in zip(instances, frame_counts, keys):
+        if key is None or key not in seen:
+            unique_instances.append(instance)
+            unique_frame_counts.append(frame_count)
+            if key is not None:
+                seen.add(key)
+    if len(unique_instances) < len(instances):
+        logger.info("♻️ %s repeated instances will reuse rendered frames", len(instances) - len(unique_instances))
+    
+    rendered = _render_unique_instances(unique_instances, unique_frame_counts, max_width, max_height)
+    repeated: Dict[str, List[RenderedFrame]] = {}
+    for key in keys:
+        if key is not None and key in repeated:
+            frames = repeated[key]
+        else:
+            frames = next(rendered)
+            if key is not None and remaining[key] > 1:
+                repeated[key] = frames
+        if key is not None:
+            remaining[key] -= 1
+            if not remaining[key]:
+                repeated.pop(key, None)
+        yield frames
+
+
+def _render_unique_instances(instances: List[Dataset], frame_counts: List[Optional[int]],
+                             max_width: float, max_height: float) -> Iterator[List[RenderedFrame]]:
+    """
+    Render instances in order, using the render process pool when configured.
+    
+    Results stream back in submission order, so pages can be laid out while later
+    instances are still rendering. If the pool breaks, the remaining instances are
+    rendered in-process.
+    """
+    workers = get_render_workers()
+    done = 0
+    if workers > 1 and len(instances) > 1:
+        chunksize = 4 if len(instances) >= workers * 8 else 1
+        try:
+            results = _get_render_pool(workers).map(
+                render_instance_frames, instances,
+                itertools.repeat(max_width), itertools.repeat(max_height), frame_counts,
+                chunksize=chunksize
+            )
+            for frames in results:
+                yield frames
+                done += 1
+            return
+        except Exception as e:
+            logger.warning("⚠️ Render pool failed (%s), rendering remaining instances in-process", e)
+            _discard_render_pool()
+    
+    for instance, frame_count in zip(instances[done:], frame_counts[done:]):
+        yield render_instance_frames(instance, max_width, max_height, frame_count)
 
 
-def create_image_page(series: DicomSeries, instance_idx: int, frame_idx: int = 0) -> Tuple[List[Any], Dict[str, str]]:
-    """Create a page with a single DICOM image."""
+def create_image_page(series: DicomSeries, instance_idx: int, frame_idx: int,
+                      total_frames: int, rendered: RenderedFrame) -> Tuple[List[Any], Dict[str, str]]:
+    """Create a page with a single (already rendered) DICOM image."""
     elements = []
     
     try:
-        instance = series.instances[instance_idx]
-        
-        # Convert DICOM to PIL
-        pil_image, metadata = dicom_to_pil(instance, frame_idx)
-        
-        # Calculate available space (A4 with margins)
-        page_width, page_height = A4
-        margin = 0.75 * inch
-        available_width = page_width - 2 * margin
-        available_height = page_height - 2 * margin - 1 * inch  # Extra space for headers/footers
+        jpeg_bytes, width, height, metadata = rendered
+        if jpeg_bytes is None:
+            raise ValueError(metadata.get('error', 'image could not be rendered'))
         
         # Convert to ReportLab image
-        rl_image = pil_to_reportlab_image(pil_image, available_width, available_height)
+        rl_image = JPEGImage(jpeg_bytes, width, height)
         
         # Center the image
-        elements.append(Spacer(1, 0.2 * inch))  # Top spacing
+        elements.append(_TOP_SPACER)  # Top spacing
         elements.append(rl_image)
         
         # Add image information
-        styles = getSampleStyleSheet()
-        info_style = ParagraphStyle(
-            'ImageInfo',
-            parent=styles['Normal'],
-            fontSize=8,
-            spaceAfter=6,
-            alignment=TA_CENTER
-        )
+        info_style = _IMAGE_INFO_STYLE
         
         # Image details
         frame_info = ""
-        total_frames = get_frame_count(instance)
         if total_frames > 1:
             frame_info = f" (Frame {frame_idx + 1}/{total_frames})"
         
@@ -227,12 +498,12 @@ def create_image_page(series: DicomSeries, instance_idx: int, frame_idx: int = 0
         
         # Window information
         window_info = ""
-        if 'window_center' in metadata and 'window_width' in metadata:
-            wc = metadata['window_center']
-            ww = metadata['window_width']
+        wc = metadata.get('window_center')
+        ww = metadata.get('window_width')
+        if wc is not None and ww is not None:  # colour images are not windowed
             window_info = f"W: {ww:.0f} / L: {wc:.0f}"
         
-        elements.append(Spacer(1, 0.1 * inch))
+        elements.append(_INFO_SPACER)
         elements.append(Paragraph(instance_info, info_style))
         if window_info:
             elements.append(Paragraph(window_info, info_style))
@@ -245,85 +516,101 @@ def create_image_page(series: DicomSeries, instance_idx: int, frame_idx: int = 0
         }
         
         # Add page break
-        elements.append(PageBreak())
+        elements.append(_PAGE_BREAK)
         
         return elements, page_metadata
         
     except Exception as e:
-        logger.error(f"Error creating image page: {e}")
+        logger.error("Error creating image page: %s", e)
         # Return error page
-        styles = getSampleStyleSheet()
-        error_style = ParagraphStyle(
-            'Error',
-            parent=styles['Normal'],
-            fontSize=12,
-            alignment=TA_CENTER
-        )
-        
-        elements.append(Spacer(1, 2 * inch))
-        elements.append(Paragraph(f"Error loading image: {str(e)}", error_style))
-        elements.append(PageBreak())
+        elements.append(_ERROR_SPACER)
+        elements.append(Paragraph(f"Error loading image: {str(e)}", _ERROR_STYLE))
+        elements.append(_PAGE_BREAK)
         
         return elements, {'series_name': 'Error', 'image_info': 'Failed to load', 'window_info': ''}
 
 
-def create_pdf_from_studies(
-    studies: Dict[str, DicomStudy],
-    anonymize: bool = False,
-    cover_page: bool = True
-) -> BytesIO:
+class FlowableStream:
     """
-    Create a PDF document from DICOM studies.
+    List-like view over a generator of flowable lists, for doc.build().
     
-    Args:
-        studies: Dictionary of DicomStudy objects
-        anonymize: Whether to anonymize patient information
-        cover_page: Whether to include a cover page
-        
-    Returns:
-        BytesIO buffer containing the PDF
+    ReportLab only reads the front of the flowables list (len, [0], del [0] and
+    inserts at the front for split content), so pages are pulled from the
+    generator as layout reaches them and dropped once drawn, instead of every
+    page of every study being held in memory until the build starts.
     """
-    start_time = time.time()
-    logger.info(f"📄 Starting PDF creation from {len(studies)} studies")
     
-    buffer = BytesIO()
+    def __init__(self, pages: Iterator[List[Any]]):
+        self._pages = pages
+        self._buffer: List[Any] = []
     
-    # Create PDF document
-    setup_start = time.time()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=0.75 * inch,
-        leftMargin=0.75 * inch,
-        topMargin=1 * inch,
-        bottomMargin=1 * inch
-    )
-    setup_time = time.time() - setup_start
-    logger.info(f"📋 PDF document setup completed in {setup_time:.3f}s")
+    def _fill(self, count: int) -> None:
+        while len(self._buffer) < count and self._pages is not None:
+            try:
+                self._buffer.extend(next(self._pages))
+            except StopIteration:
+                self._pages = None
     
-    elements = []
+    def __len__(self) -> int:
+        self._fill(1)
+        return len(self._buffer)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            self._fill(index.stop if index.stop is not None and index.stop >= 0 else float('inf'))
+        else:
+            self._fill(index + 1 if index >= 0 else float('inf'))
+        return self._buffer[index]
+    
+    def __setitem__(self, index, value) -> None:
+        self._buffer[index] = value
     
-    # Process each study
+    def __delitem__(self, index) -> None:
+        del self._buffer[index]
+    
+    def insert(self, index: int, value: Any) -> None:
+        self._buffer.insert(index, value)
+
+
+def iter_study_pages(studies: Dict[str, DicomStudy], anonymize: bool,
+                     cover_page: bool, cover_page_summary: bool = True) -> Iterator[List[Any]]:
+    """Yield the flowables of each page (cover pages and image pages) in document order."""
     study_processing_start = time.time()
     total_images = 0
     total_series = 0
     
+    # Same generation time on every cover page of the document
+    generation_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
     for study_idx, (study_uid, study) in enumerate(studies.items()):
         study_start = time.time()
-        logger.info(f"📚 Processing study {study_idx + 1}/{len(studies)}: {study_uid[:8]}...")
+        logger.info("📚 Processing study %s/%s: %.8s...", study_idx + 1, len(studies), study_uid)
+        
+        instances = [instance for series in study.series.values() for instance in series.instances]
         
         # Add cover page if requested
         if cover_page:
             cover_start = time.time()
-            cover_elements = create_cover_page(study, anonymize)
-            elements.extend(cover_elements)
+            frame_counts: Dict[int, int] = {}
+            if cover_page_summary:
+                # Header-only count (no pixel decode in this process), only for the cover summary
+                frame_counts = {id(instance): frame_count_from_metadata(instance) for instance in instances}
+            cover_elements = create_cover_page(study, anonymize, frame_counts, generation_ts,
+                                               summary=cover_page_summary)
             cover_time = time.time() - cover_start
-            logger.info(f"📑 Cover page created in {cover_time:.3f}s")
+            logger.info("📑 Cover page created in %.3fs", cover_time)
+            yield cover_elements
         
         # Process each series
         series_count = len(study.series)
         total_series += series_count
         
+        # Decode + JPEG encode of every instance (in parallel when configured), consumed in order;
+        # the renderer counts frames itself from NumberOfFrames (get_frame_count), the tag the decoder follows
+        rendered_instances = render_instances(
+            instances, [None] * len(instances), AVAILABLE_WIDTH, AVAILABLE_HEIGHT
+        )
+        
         for series_idx, (series_uid, series) in enumerate(study.series.items()):
             series_start = time.time()
             instance_count = len(series.instances)
@@ -331,58 +618,94 @@ def create_pdf_from_studies(
             # Process each instance
             series_images = 0
             for instance_idx, instance in enumerate(series.instances):
-                # Handle multi-frame instances
-                frame_count = get_frame_count(instance)
+                # Handle multi-frame instances (one rendered entry per frame)
+                rendered_frames = next(rendered_instances)
+                frame_count = len(rendered_frames)
                 
-                for frame_idx in range(frame_count):
+                for frame_idx, rendered in enumerate(rendered_frames):
                     try:
                         page_elements, page_metadata = create_image_page(
-                            series, instance_idx, frame_idx
+                            series, instance_idx, frame_idx, frame_count, rendered
                         )
-                        elements.extend(page_elements)
                         series_images += 1
                         total_images += 1
                         
                     except Exception as e:
-                        logger.error(f"❌ Error processing instance {instance_idx}, frame {frame_idx}: {e}")
+                        logger.error("❌ Error processing instance %s, frame %s: %s", instance_idx, frame_idx, e)
                         continue
+                    
+                    yield page_elements
             
             series_time = time.time() - series_start
-            logger.info(f"✅ Series completed in {series_time:.2f}s - {series_images} images processed")
+            logger.info("✅ Series completed in %.2fs - %s images processed", series_time, series_images)
         
         study_time = time.time() - study_start
-        logger.info(f"🏁 Study completed in {study_time:.2f}s")
+        logger.info("🏁 Study completed in %.2fs", study_time)
     
     study_processing_time = time.time() - study_processing_start
-    logger.info(f"📚 All studies processed in {study_processing_time:.2f}s - {total_series} series, {total_images} images total")
+    logger.info("📚 All studies processed in %.2fs - %s series, %s images total", study_processing_time, total_series, total_images)
+
+
+def create_pdf_from_studies(
+    studies: Dict[str, DicomStudy],
+    anonymize: bool = False,
+    cover_page: bool = True,
+    cover_page_summary: bool = True
+) -> BytesIO:
+    """
+    Create a PDF document from DICOM studies.
+    
+    Pages are rendered while the document is being laid out (see FlowableStream),
+    so only the pages in flight are held in memory.
+    
+    Args:
+        studies: Dictionary of DicomStudy objects
+        anonymize: Whether to anonymize patient information
+        cover_page: Whether to include a cover page
+        cover_page_summary: Whether the cover page lists each series
+        
+    Returns:
+        BytesIO buffer containing the PDF
+    """
+    start_time = time.time()
+    logger.info("📄 Starting PDF creation from %s studies", len(studies))
+    
+    buffer = BytesIO()
     
-    if not elements:
+    # Create PDF document
+    setup_start = time.time()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=0.75 * inch,
+        leftMargin=0.75 * inch,
+        topMargin=1 * inch,
+        bottomMargin=1 * inch
+    )
+    setup_time = time.time() - setup_start
+    logger.info("📋 PDF document setup completed in %.3fs", setup_time)
+    
+    elements = FlowableStream(iter_study_pages(studies, anonymize, cover_page, cover_page_summary))
+    
+    if not len(elements):
         # Create empty document with error message
         logger.warning("⚠️ No images could be processed - creating error document")
-        styles = getSampleStyleSheet()
-        error_style = ParagraphStyle(
-            'Error',
-            parent=styles['Heading1'],
-            fontSize=18,
-            alignment=TA_CENTER
-        )
-        elements.append(Spacer(1, 2 * inch))
-        elements.append(Paragraph("No images could be processed", error_style))
+        elements = [Spacer(1, 2 * inch), Paragraph("No images could be processed", _NO_IMAGES_STYLE)]
     
-    # Build PDF
+    # Build PDF (studies are processed as the build consumes their pages)
     build_start = time.time()
-    logger.info(f"🔨 Building final PDF document with {len(elements)} elements...")
+    logger.info("🔨 Building PDF document...")
     try:
         doc.build(elements)
         build_time = time.time() - build_start
         total_time = time.time() - start_time
         
         buffer_size = buffer.tell()
-        logger.info(f"✅ PDF document built successfully in {build_time:.2f}s")
-        logger.info(f"🎉 PDF creation completed in {total_time:.2f}s - Final size: {buffer_size:,} bytes")
-        logger.info(f"📊 Performance summary: Setup: {setup_time:.3f}s, Processing: {study_processing_time:.2f}s, Building: {build_time:.2f}s")
+        logger.info("✅ PDF document built successfully in %.2fs", build_time)
+        logger.info("🎉 PDF creation completed in %.2fs - Final size: %s bytes", total_time, format(buffer_size, ','))
+        logger.info("📊 Performance summary: Setup: %.3fs, Processing + building: %.2fs", setup_time, build_time)
     except Exception as e:
-        logger.error(f"❌ Error building PDF: {e}")
+        logger.error("❌ Error building PDF: %s", e)
         raise
     
     buffer.seek(0)
@@ -0,0 +1,91 @@
+"""
+Regression tests for app.image_utils
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+from pydicom import Dataset
+from pydicom.dataset import FileMetaDataset
+from pydicom.encaps import encapsulate
+
+from app.image_utils import _min_max_to_uint8, decode_reduced_frame, dicom_to_pil, dicom_to_pil_frames
+
+openjpeg = pytest.importorskip("openjpeg")
+
+
+def make_j2k_dataset(rows: int = 512, cols: int = 512) -> Dataset:
+    """12-bit monochrome CT frame stored as lossless JPEG 2000"""
+    ramp = np.linspace(0, 4095, rows * cols).reshape(rows, cols)
+    pixel_array = ramp.astype(np.uint16)
+    
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = '1.2.840.10008.1.2.4.90'
+    ds.is_little_endian = True
+    ds.is_implicit_VR = False
+    ds.Modality = 'CT'
+    ds.Rows = rows
+    ds.Columns = cols
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = 'MONOCHROME2'
+    ds.BitsAllocated = 16
+    ds.BitsStored = 12
+    ds.HighBit = 11
+    ds.PixelRepresentation = 0
+    ds.RescaleSlope = 1
+    ds.RescaleIntercept = -1024
+    ds.WindowCenter = 40
+    ds.WindowWidth = 400
+    
+    frame = bytes(openjpeg.encode(pixel_array, bits_stored=12, photometric_interpretation=0, use_mct=False))
+    ds.PixelData = encapsulate([frame])
+    ds['PixelData'].VR = 'OB'
+    return ds
+
+
+def test_reduced_j2k_keeps_stored_precision():
+    ds = make_j2k_dataset()
+    
+    reduced = decode_reduced_frame(ds, 0, (128, 128))
+    
+    assert reduced is not None
+    assert reduced.shape == (128, 128)
+    assert reduced.max() <= 4095
+
+
+def test_reduced_j2k_matches_full_decode():
+    reduced_image, _ = dicom_to_pil(make_j2k_dataset(), 0, (128, 128))
+    full_image, _ = dicom_to_pil(make_j2k_dataset(), 0)
+    full_image = full_image.resize(reduced_image.size, Image.Resampling.LANCZOS)
+    
+    diff = np.abs(np.asarray(reduced_image, dtype=np.int16) - np.asarray(full_image, dtype=np.int16))
+    assert diff.mean() < 2
+
+
+def test_reduced_path_never_decodes_full_frame(monkeypatch):
+    # Recorded rather than only raised: callers may swallow the exception
+    full_decodes = []
+    
+    def full_decode(self):
+        full_decodes.append(self)
+        raise AssertionError("pixel_array accessed on the reduced decode path")
+    monkeypatch.setattr(Dataset, 'pixel_array', property(full_decode))
+    
+    # frame_count=None: the renderer counts frames itself (get_frame_count)
+    frames = [image.size for image, _ in dicom_to_pil_frames(make_j2k_dataset(), (128, 128))]
+    
+    assert frames == [(128, 128)]
+    assert not full_decodes
+
+
+@pytest.mark.parametrize('pixel_max', [3, 255, 1023, 3001, 4095, 65535])
+def test_min_max_maps_range_ends_to_0_and_255(pixel_max):
+    pixel_array = np.array([0, pixel_max], dtype=np.uint16)
+    
+    assert _min_max_to_uint8(pixel_array, 0, pixel_max).tolist() == [0, 255]
+
+
+def test_min_max_truncates_like_apply_window():
+    # 127.5 truncates to 127 (rounding would give 128)
+    assert _min_max_to_uint8(np.array([0, 1, 2], dtype=np.int16), 0, 2).tolist() == [0, 127, 255]
@@ -0,0 +1,25 @@
+"""
+Regression tests for app.pdf_utils
+"""
+
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate
+
+from app.pdf_utils import JPEGImage, pil_to_jpeg
+
+
+def test_jpeg_image_embedded_as_dctdecode():
+    gradient = np.tile(np.arange(256, dtype=np.uint8), (128, 1))
+    jpeg_bytes, width, height = pil_to_jpeg(Image.fromarray(gradient), 300, 300)
+    
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build([JPEGImage(jpeg_bytes, width, height)])
+    pdf = buffer.getvalue()
+    
+    # The image XObject is the original JPEG stream, passed through untouched
+    assert b'/DCTDecode' in pdf
+    assert jpeg_bytes in pdf